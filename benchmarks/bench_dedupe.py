@@ -0,0 +1,55 @@
+import argparse
+import random
+import time
+
+from benchmarks.corpus import synthetic_recipe
+from src.smidge import parse_recipe
+from src.smidge.dedupe import find_duplicates
+
+
+def planted_duplicate(text: str, rng: random.Random) -> str:
+    lines = text.split('\n')
+    steps = [i for i, line in enumerate(lines) if line.startswith('# ')]
+    ingredients = [i for i, line in enumerate(lines) if line.startswith('- ')]
+
+    edit = rng.choice(['quantity', 'step', 'title'])
+    if edit == 'quantity' and ingredients:
+        i = rng.choice(ingredients)
+        lines[i] = f"- {rng.randint(5, 9)} {lines[i].split(' ', 2)[2]}"
+    elif edit == 'step' and steps:
+        i = rng.choice(steps)
+        lines[i] = lines[i] + ", then let it rest"
+    else:
+        lines = [line + " (imported)" if line.startswith('= ') else line for line in lines]
+    return '\n'.join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure near-duplicate detection on a corpus with planted duplicates')
+    parser.add_argument('-n', '--count', type=int, default=20000, help='Number of synthetic recipes (default: 20000)')
+    parser.add_argument('-d', '--duplicates', type=int, default=500, help='Number of planted duplicates (default: 500)')
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    texts = [synthetic_recipe(i) for i in range(args.count)]
+    planted = {}
+    for original in rng.sample(range(args.count), args.duplicates):
+        planted[len(texts)] = original
+        texts.append(planted_duplicate(texts[original], rng))
+    recipes = [parse_recipe(text) for text in texts]
+
+    for size in [len(recipes) // 2, len(recipes)]:
+        start = time.perf_counter()
+        clusters = find_duplicates(recipes[:size])
+        elapsed = time.perf_counter() - start
+        print(f"{size} recipes: {len(clusters)} clusters in {elapsed:.2f}s ({elapsed / size * 1e6:.0f}us per recipe)")
+
+    found = {(cluster.keep, i) for cluster in clusters for i, _ in cluster.duplicates}
+    expected = {(original, duplicate) for duplicate, original in planted.items()}
+    recall = len(found & expected) / len(expected)
+    precision = len(found & expected) / len(found) if found else 1.0
+    print(f"planted {len(expected)}: recall {recall:.3f}, precision {precision:.3f}")
+
+
+if __name__ == '__main__':
+    main()
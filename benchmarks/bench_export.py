@@ -0,0 +1,33 @@
+import argparse
+import os
+import resource
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.corpus import write_corpus
+from src.smidge.export import iter_recipes, write_csv, write_jsonl
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure smidge export throughput')
+    parser.add_argument('-n', '--count', type=int, default=10000, help='Number of synthetic recipes (default: 10000)')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = write_corpus(Path(tmp), args.count)
+
+        for name, write in [('jsonl', write_jsonl), ('csv', write_csv)]:
+            with open(os.devnull, 'w') as out:
+                start = time.perf_counter()
+                count = write(iter_recipes(paths), out)
+                elapsed = time.perf_counter() - start
+
+            print(f"{name}: {count} records in {elapsed:.2f}s ({count / elapsed:,.0f} records/s)")
+
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(f"peak RSS: {max_rss / 1024:.1f} MiB")
+
+
+if __name__ == '__main__':
+    main()
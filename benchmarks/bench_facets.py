@@ -0,0 +1,73 @@
+import argparse
+import random
+import time
+
+from benchmarks.corpus import CATEGORIES
+from src.smidge import Recipe
+from src.smidge.facets import FacetIndex, parse_query, recipe_facets
+
+TAGS = ['kids', 'vegan', 'quick', 'holiday', 'spicy', 'gluten-free']
+
+
+def synthetic_metadata(rng: random.Random) -> dict:
+    return {
+        'Category': rng.choice(CATEGORIES),
+        'Prep Time': f"{rng.randint(5, 60)} minutes",
+        'Cook Time': rng.choice([f"{rng.randint(0, 120)} minutes", f"1 hour {rng.randint(0, 59)} minutes", 'PT45M']),
+        'Servings': rng.randint(1, 12),
+        'Tags': rng.sample(TAGS, rng.randint(0, 3)),
+    }
+
+
+def scan(recipes: list[Recipe], query: str) -> list[int]:
+    conditions = parse_query(query)
+    matches = []
+    for i, recipe in enumerate(recipes):
+        facets = recipe_facets(recipe)
+        values = {'category': [c.casefold() for c in facets.categories], 'tags': [t.casefold() for t in facets.tags]}
+        ok = True
+        for condition in conditions:
+            if condition.field in values:
+                ok = (condition.value in values[condition.field]) == (condition.op == '=')
+            else:
+                value = getattr(facets, condition.field.replace(' ', '_'))
+                ok = value is not None and {
+                    '<': value < condition.value, '<=': value <= condition.value,
+                    '>': value > condition.value, '>=': value >= condition.value,
+                    '=': value == condition.value, '!=': value != condition.value,
+                }[condition.op]
+            if not ok:
+                break
+        if ok:
+            matches.append(i)
+    return matches
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure facet index build and query time')
+    parser.add_argument('-n', '--count', type=int, default=100000, help='Number of synthetic recipes (default: 100000)')
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    recipes = [Recipe(title=f"Recipe {i}", components=[], metadata=synthetic_metadata(rng)) for i in range(args.count)]
+
+    start = time.perf_counter()
+    index = FacetIndex(recipes)
+    print(f"index: {args.count} recipes in {time.perf_counter() - start:.2f}s")
+
+    for query in ['Category=Dessert and total time < 45 min', 'servings >= 10 and tags = kids', 'prep time <= 6 and cook time > 1 hour']:
+        start = time.perf_counter()
+        for _ in range(10):
+            selected = index.select(query)
+        indexed = (time.perf_counter() - start) / 10
+
+        start = time.perf_counter()
+        scanned = scan(recipes, query)
+        linear = time.perf_counter() - start
+
+        assert selected == scanned
+        print(f"{query!r}: {len(selected)} matches, index {indexed * 1000:.2f}ms, scan {linear * 1000:.0f}ms")
+
+
+if __name__ == '__main__':
+    main()
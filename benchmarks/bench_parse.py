@@ -0,0 +1,94 @@
+import argparse
+import sys
+import time
+
+from src.smidge import parse_recipe, ParseLimits, RecipeLimitError
+
+
+UNLIMITED = ParseLimits(
+    max_frontmatter_size=sys.maxsize,
+    max_line_length=sys.maxsize,
+    max_yaml_depth=sys.maxsize,
+    max_yaml_nodes=sys.maxsize,
+)
+
+
+def unterminated_frontmatter(n: int) -> str:
+    return "---\n= Title\n" + "- 1 cup flour\n" * n
+
+
+def long_line(n: int) -> str:
+    return "= Title\n\n- " + "x" * (n * 20) + "\n"
+
+
+def whitespace_padding(n: int) -> str:
+    return " " * (n * 10) + "= Title\n" + "   \n" * n + "# step\n"
+
+
+def many_components(n: int) -> str:
+    return "= Title\n" + "".join(f"+ Part {i}\n- 1 egg\n# Mix\n  - salt\n" for i in range(n))
+
+
+def orphan_lines(n: int) -> str:
+    return "? not a recipe line\n" * n + "= Title\n"
+
+
+def large_frontmatter(n: int) -> str:
+    return "---\n" + "".join(f"key{i}: value {i}\n" for i in range(n)) + "---\n= Title\n"
+
+
+def alias_bomb(n: int) -> str:
+    text = "---\na0: &a0 [x, x, x, x, x, x, x, x, x, x]\n"
+    for i in range(1, n // 100 + 2):
+        text += f"a{i}: &a{i} [" + ", ".join([f"*a{i - 1}"] * 10) + "]\n"
+    return text + "---\n= Title\n"
+
+
+CASES = [
+    ('unterminated frontmatter', unterminated_frontmatter, UNLIMITED),
+    ('long line', long_line, UNLIMITED),
+    ('whitespace padding', whitespace_padding, UNLIMITED),
+    ('many components', many_components, UNLIMITED),
+    ('orphan lines', orphan_lines, UNLIMITED),
+    ('large frontmatter', large_frontmatter, UNLIMITED),
+    ('alias bomb', alias_bomb, ParseLimits()),
+]
+
+
+def time_parse(text: str, limits: ParseLimits, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        try:
+            parse_recipe(text, [], limits=limits)
+        except RecipeLimitError:
+            pass
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check that parse_recipe stays linear on adversarial input')
+    parser.add_argument('-n', '--size', type=int, default=2000, help='Base input size (default: 2000)')
+    parser.add_argument('--scale', type=int, default=16, help='Largest multiple of the base size (default: 16)')
+    parser.add_argument('--tolerance', type=float, default=2.5, help='Allowed slowdown over linear growth (default: 2.5)')
+    parser.add_argument('-r', '--repeat', type=int, default=5, help='Timing repetitions per size (default: 5)')
+    args = parser.parse_args()
+
+    failed = False
+
+    for name, generate, limits in CASES:
+        small = time_parse(generate(args.size), limits, args.repeat)
+        large = time_parse(generate(args.size * args.scale), limits, args.repeat)
+        ratio = large / small
+
+        ok = ratio <= args.scale * args.tolerance
+        failed |= not ok
+
+        print(f"{name:26} {small * 1000:8.2f} ms -> {large * 1000:8.2f} ms  x{ratio:6.1f}  {'ok' if ok else 'SUPER-LINEAR'}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,41 @@
+import argparse
+import copy
+import random
+import time
+
+from benchmarks.corpus import synthetic_recipe
+from src.smidge import Step, parse_recipe
+from src.smidge.snapshot import build_manifest, diff_manifests
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure snapshot manifest build and diff time')
+    parser.add_argument('-n', '--count', type=int, default=20000, help='Number of synthetic recipes (default: 20000)')
+    args = parser.parse_args()
+
+    recipes = [(f"recipes/recipe-{i}.recipe", parse_recipe(synthetic_recipe(i))) for i in range(args.count)]
+
+    start = time.perf_counter()
+    old = build_manifest(recipes)
+    print(f"manifest: {args.count} recipes in {time.perf_counter() - start:.2f}s")
+
+    rng = random.Random(0)
+    for changes in [1, 10, 100, 1000]:
+        edited = list(recipes)
+        for i in rng.sample(range(len(edited)), changes):
+            path, recipe = edited[i]
+            recipe = copy.deepcopy(recipe)
+            recipe.components[0].steps.append(Step(text="Rest for five minutes"))
+            edited[i] = (path, recipe)
+        new = build_manifest(edited)
+
+        start = time.perf_counter()
+        diff = diff_manifests(old, new)
+        elapsed = time.perf_counter() - start
+
+        assert len(diff.modified) == changes
+        print(f"{changes} changes: diff in {elapsed * 1000:.2f}ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+import argparse
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.corpus import synthetic_recipe
+from src.smidge import parse_recipe
+from src.smidge.rendering import recipe_to_typst
+
+
+def _compiler():
+    if shutil.which('typst'):
+        def compile_cli(source: str, format: str) -> list[bytes]:
+            with tempfile.TemporaryDirectory() as tmp:
+                input_path = Path(tmp) / 'input.typ'
+                input_path.write_text(source)
+                output = Path(tmp) / ('page-{n}.png' if format == 'png' else 'page-1.pdf')
+                subprocess.run(['typst', 'compile', '--format', format, '--ppi', '72', str(input_path), str(output)], check=True)
+                outputs = sorted(Path(tmp).glob(f"page-*.{format}"), key=lambda path: int(path.stem.split('-')[1]))
+                return [path.read_bytes() for path in outputs]
+        return compile_cli
+
+    try:
+        import typst
+    except ImportError:
+        return None
+
+    def compile_module(source: str, format: str) -> list[bytes]:
+        result = typst.compile(source.encode(), format=format, ppi=72)
+        return result if isinstance(result, list) else [result]
+
+    return compile_module
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare default and compact Typst output')
+    parser.add_argument('-n', '--count', type=int, default=200, help='Number of synthetic recipes (default: 200)')
+    parser.add_argument('--no-compile', action='store_true', help='Only measure source size')
+    args = parser.parse_args()
+
+    recipes = [parse_recipe(synthetic_recipe(i)) for i in range(args.count)]
+    sources = {
+        'default': recipe_to_typst(recipes, title='Cookbook'),
+        'compact': recipe_to_typst(recipes, title='Cookbook', compact=True),
+    }
+
+    for name, source in sources.items():
+        print(f"{name}: {len(source.encode()):,} bytes, {source.count(chr(10)):,} lines")
+
+    compile_typst = None if args.no_compile else _compiler()
+    if compile_typst is None:
+        if not args.no_compile:
+            print('typst not found, skipping compile time and visual comparison')
+        return 0
+
+    for name, source in sources.items():
+        start = time.perf_counter()
+        compile_typst(source, 'pdf')
+        print(f"{name}: compiled in {time.perf_counter() - start:.2f}s")
+
+    pages = {name: compile_typst(source, 'png') for name, source in sources.items()}
+    differing = [i + 1 for i, (a, b) in enumerate(zip(pages['default'], pages['compact'])) if a != b]
+
+    if len(pages['default']) != len(pages['compact']) or differing:
+        print(f"visual check FAILED: {len(pages['default'])} vs {len(pages['compact'])} pages, differing pages {differing[:10]}")
+        return 1
+
+    print(f"visual check passed: {len(pages['default'])} identical pages")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
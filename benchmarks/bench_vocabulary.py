@@ -0,0 +1,65 @@
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from benchmarks.corpus import INGREDIENTS, UNITS
+from src.smidge.vocabulary import IngredientMatcher, load_matcher
+
+ALLERGENS = ['celery', 'egg', 'fish', 'gluten', 'milk', 'mustard', 'nuts', 'peanut', 'sesame', 'soy']
+SYLLABLES = ['ka', 'lo', 'mi', 'ra', 'ten', 'bor', 'vel', 'sa', 'pi', 'nut', 'gra', 'do', 'fen', 'ul', 'zo', 'che']
+
+
+def synthetic_vocabulary(count: int, rng: random.Random) -> list[dict]:
+    words = list({''.join(rng.choices(SYLLABLES, k=rng.randint(2, 4))) for _ in range(count)})
+    terms = {name: {'term': name, 'allergens': rng.sample(ALLERGENS, 1)} for name in INGREDIENTS}
+    while len(terms) < count:
+        name = ' '.join(rng.choices(words, k=rng.randint(1, 3)))
+        terms[name] = {'term': name, 'canonical': name.split()[-1], 'allergens': rng.sample(ALLERGENS, rng.randint(0, 2))}
+    return list(terms.values())
+
+
+def synthetic_line(rng: random.Random, vocabulary: list[dict]) -> str:
+    name = rng.choice(INGREDIENTS) if rng.random() < 0.7 else rng.choice(vocabulary)['term']
+    return f"{rng.randint(1, 4)} {rng.choice(UNITS)} {name}, finely chopped"
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure ingredient matcher throughput')
+    parser.add_argument('-n', '--terms', type=int, default=50000, help='Vocabulary size (default: 50000)')
+    parser.add_argument('-l', '--lines', type=int, default=200000, help='Ingredient lines to annotate (default: 200000)')
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    vocabulary = synthetic_vocabulary(args.terms, rng)
+    lines = [synthetic_line(rng, vocabulary) for _ in range(args.lines)]
+
+    start = time.perf_counter()
+    matcher = IngredientMatcher.from_terms(vocabulary)
+    print(f"build: {len(vocabulary)} terms in {time.perf_counter() - start:.2f}s")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'matcher.json')
+        matcher.save(path)
+        start = time.perf_counter()
+        matcher = load_matcher(path)
+        print(f"load: {os.path.getsize(path) / 1024 / 1024:.1f} MiB in {time.perf_counter() - start:.2f}s")
+
+    start = time.perf_counter()
+    matched = sum(1 for line in lines if matcher.match(line))
+    elapsed = time.perf_counter() - start
+    print(f"trie: {len(lines)} lines in {elapsed:.2f}s ({len(lines) / elapsed:,.0f} lines/s), {matched} with matches")
+
+    sample = lines[:200]
+    terms = [term['term'].lower() for term in vocabulary]
+    start = time.perf_counter()
+    for line in sample:
+        lowered = line.lower()
+        [term for term in terms if term in lowered]
+    elapsed = time.perf_counter() - start
+    print(f"substring scan: {len(sample) / elapsed:,.0f} lines/s")
+
+
+if __name__ == '__main__':
+    main()
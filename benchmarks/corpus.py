@@ -0,0 +1,44 @@
+import random
+from pathlib import Path
+
+
+CATEGORIES = ['Breakfast', 'Dessert', 'Main', 'Salad', 'Soup']
+UNITS = ['cup', 'cups', 'tbsp', 'tsp', 'g', 'oz', 'lb', 'ml']
+INGREDIENTS = ['flour', 'sugar', 'butter', 'eggs', 'milk', 'salt', 'olive oil', 'garlic', 'onion',
+               'tomatoes', 'basil', 'chicken breast', 'rice', 'carrots', 'celery', 'lemon juice',
+               'honey', 'cinnamon', 'cocoa powder', 'vanilla extract', 'parmesan', 'spinach']
+VERBS = ['Mix', 'Whisk', 'Fold', 'Bake', 'Simmer', 'Chop', 'Stir', 'Season', 'Roast', 'Serve']
+
+
+def synthetic_recipe(index: int, rng: random.Random | None = None) -> str:
+    rng = rng or random.Random(index)
+
+    text = "---\n"
+    text += f"Category: {rng.choice(CATEGORIES)}\n"
+    text += f"Prep Time: {rng.randint(5, 60)} minutes\n"
+    text += f"Cook Time: {rng.randint(0, 120)} minutes\n"
+    text += f"Servings: {rng.randint(1, 12)}\n"
+    text += "---\n"
+    text += f"= Recipe {index}\n\n"
+
+    for component in range(rng.randint(1, 3)):
+        text += f"+ Part {component + 1}\n\n"
+        for _ in range(rng.randint(2, 8)):
+            text += f"- {rng.randint(1, 4)} {rng.choice(UNITS)} {rng.choice(INGREDIENTS)}\n"
+        text += "\n"
+        for _ in range(rng.randint(2, 6)):
+            text += f"# {rng.choice(VERBS)} the {rng.choice(INGREDIENTS)} until ready\n"
+            if rng.random() < 0.3:
+                text += f"  - {rng.randint(1, 4)} {rng.choice(UNITS)} {rng.choice(INGREDIENTS)}\n"
+        text += "\n"
+
+    return text
+
+
+def write_corpus(directory: Path, count: int) -> list[str]:
+    paths = []
+    for i in range(count):
+        path = directory / f"recipe-{i}.recipe"
+        path.write_text(synthetic_recipe(i))
+        paths.append(str(path))
+    return paths
@@ -1,6 +1,8 @@
 from dataclasses import dataclass, field
 import yaml
 
+_YamlLoader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
 
 @dataclass
 class Step:
@@ -22,42 +24,164 @@ class Recipe:
     metadata: dict[str, str] = field(default_factory=dict)
 
 
-def parse_recipe(recipe_text):
-    lines = recipe_text.strip().split('\n')
+@dataclass
+class Diagnostic:
+    line: int
+    severity: str
+    message: str
+
+
+@dataclass(frozen=True)
+class ParseLimits:
+    max_frontmatter_size: int = 64 * 1024
+    max_line_length: int = 16 * 1024
+    max_yaml_depth: int = 64
+    max_yaml_nodes: int = 10_000
+
+
+DEFAULT_LIMITS = ParseLimits()
 
+
+class RecipeLimitError(ValueError):
+    pass
+
+
+def _yaml_depth(frontmatter: str, limit: int) -> int:
+    depth = 0
+    for event in yaml.parse(frontmatter, Loader=_YamlLoader):
+        if isinstance(event, (yaml.MappingStartEvent, yaml.SequenceStartEvent)):
+            depth += 1
+            if depth > limit:
+                break
+        elif isinstance(event, (yaml.MappingEndEvent, yaml.SequenceEndEvent)):
+            depth -= 1
+    return depth
+
+
+def _yaml_node_count(root, limit: int) -> int:
+    counts = {}
+    active = set()
+    stack = [(root, False)]
+
+    while stack:
+        node, done = stack.pop()
+        key = id(node)
+
+        if done:
+            active.discard(key)
+            total = 1
+            for child in _yaml_children(node):
+                total += counts[id(child)]
+            counts[key] = min(total, limit + 1)
+            continue
+
+        if key in counts:
+            continue
+        if key in active:
+            raise RecipeLimitError('frontmatter contains a recursive alias')
+
+        active.add(key)
+        stack.append((node, True))
+        stack.extend((child, False) for child in _yaml_children(node))
+
+    return counts[id(root)]
+
+
+def _yaml_children(node):
+    if isinstance(node, yaml.MappingNode):
+        for key, value in node.value:
+            yield key
+            yield value
+    elif isinstance(node, yaml.SequenceNode):
+        yield from node.value
+
+
+def _load_frontmatter(frontmatter: str, limits: ParseLimits):
+    if _yaml_depth(frontmatter, limits.max_yaml_depth) > limits.max_yaml_depth:
+        raise RecipeLimitError(f'frontmatter nesting exceeds {limits.max_yaml_depth} levels')
+
+    loader = _YamlLoader(frontmatter)
+    try:
+        node = loader.get_single_node()
+        if node is None:
+            return None
+        if _yaml_node_count(node, limits.max_yaml_nodes) > limits.max_yaml_nodes:
+            raise RecipeLimitError(f'frontmatter expands to more than {limits.max_yaml_nodes} values')
+        return loader.construct_document(node)
+    finally:
+        loader.dispose()
+
+
+def _split_frontmatter(lines, limits: ParseLimits, report, exceeded):
     metadata = {}
     content_start = 0
+    terminated = True
 
     if lines and lines[0].strip() == '---':
-        for i, line in enumerate(lines[1:], 1):
+        terminated = False
+        frontmatter_size = 0
+        for i in range(1, len(lines)):
+            line = lines[i]
+            frontmatter_size += len(line) + 1
+            if frontmatter_size > limits.max_frontmatter_size:
+                exceeded(0, f'frontmatter exceeds {limits.max_frontmatter_size} characters')
+
             if line.strip() == '---':
                 frontmatter = '\n'.join(lines[1:i])
-                metadata = yaml.safe_load(frontmatter) or {}
+                try:
+                    metadata = _load_frontmatter(frontmatter, limits) or {}
+                except RecipeLimitError as e:
+                    exceeded(1, str(e))
+                except yaml.YAMLError as e:
+                    mark = getattr(e, 'problem_mark', None)
+                    report(1 + (mark.line if mark else 0), 'error', f'invalid frontmatter: {getattr(e, "problem", None) or e}')
+                    raise
+                if not isinstance(metadata, dict):
+                    report(1, 'error', 'frontmatter is not a mapping')
+                    metadata = {}
                 content_start = i + 1
+                terminated = True
                 break
+        else:
+            report(0, 'warning', 'unterminated frontmatter')
 
-    lines = lines[content_start:]
+    return metadata, content_start, terminated
 
-    recipe_title = None
-    components = []
-    current_component = None
-    current_step = None
+
+def _scan_lines(lines, start: int, end: int, limits: ParseLimits, exceeded):
+    entries = []
     has_subtitles = False
 
-    for line in lines:
-        if line.strip() and line.lstrip().startswith('+ '):
-            has_subtitles = True
-            break
+    for index in range(start, end):
+        line = lines[index]
 
-    for line in lines:
-        stripped = line.strip()
+        if len(line) > limits.max_line_length:
+            exceeded(index, f'line exceeds {limits.max_line_length} characters')
 
-        if not stripped:
+        stripped_left = line.lstrip()
+
+        if not stripped_left:
             continue
 
-        stripped_left = line.lstrip()
+        if stripped_left.startswith('+ '):
+            has_subtitles = True
+
+        entries.append((index, len(line) - len(stripped_left), stripped_left))
+
+    return entries, has_subtitles
+
+
+def _build_components(entries, has_subtitles: bool, report):
+    recipe_title = None
+    components = []
+    current_component = None
+    current_step = None
 
+    for index, indent, stripped_left in entries:
         if stripped_left.startswith('= '):
+            if recipe_title is not None:
+                report(index, 'warning', 'duplicate title')
+
             recipe_title = stripped_left[2:].strip()
 
             if not has_subtitles:
@@ -72,8 +196,6 @@ def parse_recipe(recipe_text):
         elif stripped_left.startswith('- ') or stripped_left.startswith('* '):
             ingredient = stripped_left[2:].strip()
 
-            indent = len(line) - len(stripped_left)
-
             if indent == 2 and current_step is not None:
                 if current_step.ingredients is None:
                     current_step.ingredients = []
@@ -83,6 +205,8 @@ def parse_recipe(recipe_text):
                     if current_component.ingredients is None:
                         current_component.ingredients = []
                     current_component.ingredients.append(ingredient)
+                else:
+                    report(index, 'warning', 'ingredient outside of any component')
 
         elif stripped_left.startswith('# '):
             step_text = stripped_left[2:].strip()
@@ -90,8 +214,33 @@ def parse_recipe(recipe_text):
             if current_component is not None:
                 current_component.steps.append(step)
                 current_step = step
+            else:
+                report(index, 'warning', 'step outside of any component')
+
+        else:
+            report(index, 'warning', f'unrecognized line: {stripped_left[:40].rstrip()}')
+
+    return recipe_title, components
+
+
+def parse_recipe(recipe_text, diagnostics: list[Diagnostic] | None = None, limits: ParseLimits = DEFAULT_LIMITS):
+    lines = recipe_text.strip().split('\n')
+    first_line = recipe_text[:len(recipe_text) - len(recipe_text.lstrip())].count('\n') + 1
+
+    def report(index, severity, message):
+        if diagnostics is not None:
+            diagnostics.append(Diagnostic(line=first_line + index, severity=severity, message=message))
+
+    def exceeded(index, message):
+        report(index, 'error', message)
+        raise RecipeLimitError(f'line {first_line + index}: {message}')
+
+    metadata, content_start, _ = _split_frontmatter(lines, limits, report, exceeded)
+    entries, has_subtitles = _scan_lines(lines, content_start, len(lines), limits, exceeded)
+    recipe_title, components = _build_components(entries, has_subtitles, report)
 
     if recipe_title is None:
+        report(0, 'error', 'missing title')
         return None
 
     return Recipe(title=recipe_title, components=components, metadata=metadata)
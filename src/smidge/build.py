@@ -0,0 +1,199 @@
+import glob
+import os
+from collections import defaultdict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable
+
+import yaml
+
+from src.smidge.dedupe import drop_duplicates
+from src.smidge.export import iter_recipes
+from src.smidge.facets import FacetIndex, where_conditions
+from src.smidge.rendering import cached_recipe_renderer, recipe_to_typst
+
+
+class BuildError(ValueError):
+    pass
+
+
+@dataclass
+class Target:
+    name: str
+    output: Path
+    title: str | None = 'Cookbook'
+    subtitle: str | None = None
+    image: str | None = None
+    where: dict | str = field(default_factory=dict)
+    depends: list[str] = field(default_factory=list)
+    compact: bool = False
+
+
+@dataclass
+class BuildSpec:
+    inputs: list[str]
+    targets: list[Target]
+    skip_duplicates: bool = False
+
+
+@dataclass
+class Job:
+    name: str
+    run: Callable[[], None]
+    depends: list[str] = field(default_factory=list)
+
+
+def load_build_file(path: str) -> BuildSpec:
+    build_path = Path(path)
+    base = build_path.parent
+    data = yaml.safe_load(build_path.read_text()) or {}
+
+    if not isinstance(data, dict) or not isinstance(data.get('targets'), dict):
+        raise BuildError(f"{path}: expected a 'targets' mapping")
+
+    patterns = data.get('input', '*.recipe')
+    if isinstance(patterns, str):
+        patterns = [patterns]
+
+    inputs = []
+    for pattern in patterns:
+        inputs.extend(sorted(glob.glob(str(base / pattern), recursive=True)))
+
+    output_dir = base / data.get('output', '.')
+
+    targets = []
+    for name, options in data['targets'].items():
+        options = options or {}
+        image = options.get('image')
+        targets.append(Target(
+            name=name,
+            output=output_dir / options.get('output', f"{name}.pdf"),
+            title=options.get('title', 'Cookbook'),
+            subtitle=options.get('subtitle'),
+            image=str((base / image).resolve()) if image else None,
+            where=options.get('where') or {},
+            depends=list(options.get('depends') or []),
+            compact=bool(options.get('compact', False)),
+        ))
+
+    return BuildSpec(inputs=inputs, targets=targets, skip_duplicates=bool(data.get('skip_duplicates', False)))
+
+
+def run_jobs(jobs: list[Job], max_workers: int | None = None) -> dict[str, BaseException | None]:
+    by_name = {job.name: job for job in jobs}
+    dependents = defaultdict(list)
+    waiting = {}
+
+    for job in jobs:
+        for dependency in job.depends:
+            if dependency not in by_name:
+                raise BuildError(f"{job.name} depends on unknown job {dependency}")
+            dependents[dependency].append(job.name)
+        waiting[job.name] = set(job.depends)
+
+    _check_acyclic(jobs, dependents)
+
+    results = {}
+    ready = [job.name for job in jobs if not job.depends]
+
+    with ThreadPoolExecutor(max_workers=max_workers or os.cpu_count() or 1) as executor:
+        running = {}
+
+        while ready or running:
+            for name in ready:
+                running[executor.submit(by_name[name].run)] = name
+            ready = []
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                error = future.exception()
+                results[name] = error
+
+                if error is not None:
+                    _skip_dependents(name, dependents, results)
+                    continue
+
+                for dependent in dependents[name]:
+                    waiting[dependent].discard(name)
+                    if not waiting[dependent] and dependent not in results:
+                        ready.append(dependent)
+
+    return results
+
+
+def _check_acyclic(jobs: list[Job], dependents: dict[str, list[str]]):
+    indegree = {job.name: len(job.depends) for job in jobs}
+    queue = [name for name, degree in indegree.items() if degree == 0]
+    visited = 0
+
+    while queue:
+        name = queue.pop()
+        visited += 1
+        for dependent in dependents[name]:
+            indegree[dependent] -= 1
+            if indegree[dependent] == 0:
+                queue.append(dependent)
+
+    if visited != len(jobs):
+        cycle = sorted(name for name, degree in indegree.items() if degree > 0)
+        raise BuildError(f"dependency cycle between {', '.join(cycle)}")
+
+
+def _skip_dependents(name: str, dependents: dict[str, list[str]], results: dict):
+    stack = list(dependents[name])
+    while stack:
+        dependent = stack.pop()
+        if dependent in results:
+            continue
+        results[dependent] = BuildError(f"skipped because {name} failed")
+        stack.extend(dependents[dependent])
+
+
+def build(spec: BuildSpec, compile_pdf, jobs: int | None = None, selected: list[str] | None = None, on_error=None) -> dict[str, BaseException | None]:
+    targets = {target.name: target for target in spec.targets}
+
+    wanted = set()
+    stack = list(selected or targets)
+    while stack:
+        name = stack.pop()
+        if name in wanted:
+            continue
+        if name not in targets:
+            raise BuildError(f"unknown target {name}")
+        wanted.add(name)
+        stack.extend(targets[name].depends)
+
+    corpus = []
+    indexes = []
+    sources = {}
+    renderers = {False: cached_recipe_renderer(), True: cached_recipe_renderer(compact=True)}
+
+    def parse():
+        recipes = [recipe for _, recipe in iter_recipes(spec.inputs, on_error)]
+        corpus.extend(drop_duplicates(recipes) if spec.skip_duplicates else recipes)
+        indexes.append(FacetIndex(corpus))
+
+    def render(target: Target):
+        recipes = indexes[0].filter(target.where if isinstance(target.where, str) else where_conditions(target.where))
+        if not recipes:
+            raise BuildError(f"no recipes match target {target.name}")
+        sources[target.name] = recipe_to_typst(recipes, title=target.title, subtitle=target.subtitle, image=target.image, render_recipe=renderers[target.compact], compact=target.compact)
+
+    def compile_target(target: Target):
+        target.output.parent.mkdir(parents=True, exist_ok=True)
+        compile_pdf(sources.pop(target.name), target.output)
+
+    job_list = [Job('parse', parse)]
+    for target in spec.targets:
+        if target.name not in wanted:
+            continue
+        job_list.append(Job(f"render:{target.name}", lambda target=target: render(target), ['parse']))
+        job_list.append(Job(
+            f"compile:{target.name}",
+            lambda target=target: compile_target(target),
+            [f"render:{target.name}"] + [f"compile:{dependency}" for dependency in target.depends],
+        ))
+
+    return run_jobs(job_list, jobs)
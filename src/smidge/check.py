@@ -0,0 +1,94 @@
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from xml.etree import ElementTree
+
+import yaml
+
+from src.smidge import parse_recipe, Diagnostic, RecipeLimitError
+
+
+@dataclass
+class FileReport:
+    path: str
+    diagnostics: list[Diagnostic] = field(default_factory=list)
+
+    def failures(self, strict: bool = False) -> list[Diagnostic]:
+        return [d for d in self.diagnostics if strict or d.severity == 'error']
+
+
+def check_file(path: str) -> FileReport:
+    report = FileReport(path=path)
+
+    try:
+        recipe_text = Path(path).read_text()
+    except (OSError, UnicodeDecodeError) as e:
+        report.diagnostics.append(Diagnostic(line=0, severity='error', message=str(e)))
+        return report
+
+    try:
+        parse_recipe(recipe_text, report.diagnostics)
+    except (yaml.YAMLError, RecipeLimitError):
+        pass
+
+    return report
+
+
+def check_files(paths: list[str], jobs: int | None = None) -> list[FileReport]:
+    workers = jobs or os.cpu_count() or 1
+
+    if workers == 1 or len(paths) < 2:
+        return [check_file(path) for path in paths]
+
+    chunksize = max(1, len(paths) // (workers * 8))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(check_file, paths, chunksize=chunksize))
+
+
+def reports_to_text(reports: list[FileReport]) -> str:
+    lines = []
+    for report in reports:
+        for d in report.diagnostics:
+            lines.append(f"{report.path}:{d.line}: {d.severity}: {d.message}")
+    return '\n'.join(lines) + '\n' if lines else ''
+
+
+def reports_to_json(reports: list[FileReport]) -> str:
+    diagnostics = [
+        {'path': report.path, 'line': d.line, 'severity': d.severity, 'message': d.message}
+        for report in reports
+        for d in report.diagnostics
+    ]
+    return json.dumps({
+        'files': len(reports),
+        'errors': sum(1 for d in diagnostics if d['severity'] == 'error'),
+        'warnings': sum(1 for d in diagnostics if d['severity'] == 'warning'),
+        'diagnostics': diagnostics,
+    }, indent=2) + '\n'
+
+
+def reports_to_junit(reports: list[FileReport], strict: bool = False) -> str:
+    failing = [report for report in reports if report.failures(strict)]
+
+    suite = ElementTree.Element('testsuite', {
+        'name': 'smidge',
+        'tests': str(len(reports)),
+        'failures': str(len(failing)),
+        'errors': '0',
+    })
+
+    for report in reports:
+        case = ElementTree.SubElement(suite, 'testcase', {'classname': 'smidge.check', 'name': report.path})
+
+        for d in report.failures(strict):
+            failure = ElementTree.SubElement(case, 'failure', {'type': d.severity, 'message': f"line {d.line}: {d.message}"})
+            failure.text = f"{report.path}:{d.line}: {d.message}"
+
+        warnings = [d for d in report.diagnostics if not (strict or d.severity == 'error')]
+        if warnings:
+            output = ElementTree.SubElement(case, 'system-out')
+            output.text = '\n'.join(f"{report.path}:{d.line}: {d.severity}: {d.message}" for d in warnings)
+
+    return ElementTree.tostring(suite, encoding='unicode', xml_declaration=True) + '\n'
@@ -0,0 +1,171 @@
+import errno
+import os
+import re
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+from src.smidge import Diagnostic
+from src.smidge.metrics import LatencyTracker
+
+
+@dataclass(frozen=True)
+class CompileLimits:
+    timeout: float = 120.0
+    memory: int | None = 4 * 1024 * 1024 * 1024
+    cpu: int | None = 300
+
+
+DEFAULT_COMPILE_LIMITS = CompileLimits()
+
+_DIAGNOSTIC = re.compile(r'^(?P<severity>error|warning): (?P<message>.*)$')
+_LOCATION = re.compile(r'┌─ .*?:(?P<line>\d+):\d+')
+
+
+class CompileError(Exception):
+    def __init__(self, message: str, returncode: int | None = None, stderr: str = '',
+                 diagnostics: list[Diagnostic] | None = None, timed_out: bool = False, transient: bool | None = None):
+        super().__init__(message)
+        self.returncode = returncode
+        self.stderr = stderr
+        self.diagnostics = diagnostics or []
+        self.timed_out = timed_out
+        self.attempts = 1
+
+        if transient is None:
+            transient = not timed_out and returncode not in (-signal.SIGXCPU, -signal.SIGABRT) and not any(diagnostic.severity == 'error' for diagnostic in self.diagnostics)
+        self.transient = transient
+
+
+def parse_typst_diagnostics(stderr: str) -> list[Diagnostic]:
+    diagnostics = []
+
+    for line in stderr.splitlines():
+        match = _DIAGNOSTIC.match(line)
+        if match:
+            diagnostics.append(Diagnostic(line=0, severity=match['severity'], message=match['message']))
+            continue
+
+        match = _LOCATION.search(line)
+        if match and diagnostics and diagnostics[-1].line == 0:
+            diagnostics[-1].line = int(match['line'])
+
+    return diagnostics
+
+
+_LIMIT_SHIM = """
+import os, resource, sys
+memory, cpu = int(sys.argv[1]), int(sys.argv[2])
+if memory >= 0:
+    resource.setrlimit(resource.RLIMIT_AS, (memory, memory))
+if cpu >= 0:
+    resource.setrlimit(resource.RLIMIT_CPU, (cpu, cpu))
+os.execv(sys.argv[3], sys.argv[3:])
+"""
+
+
+def _limited(command: list[str], limits: CompileLimits) -> list[str]:
+    if limits.memory is None and limits.cpu is None:
+        return command
+    memory = -1 if limits.memory is None else limits.memory
+    cpu = -1 if limits.cpu is None else limits.cpu
+    return [sys.executable, '-I', '-S', '-c', _LIMIT_SHIM, str(memory), str(cpu), *command]
+
+
+class TypstCompiler:
+    def __init__(self, executable: str | None = None, limits: CompileLimits = DEFAULT_COMPILE_LIMITS,
+                 retries: int = 2, retry_delay: float = 0.5, root: str = '/'):
+        self.executable = executable or os.environ.get('SMIDGE_TYPST', 'typst')
+        self.limits = limits
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self.root = root
+        self.latency = LatencyTracker()
+
+    def compile(self, typst_code: str, output_path: Path):
+        output_path = Path(output_path)
+        start = time.perf_counter()
+
+        fd, source = tempfile.mkstemp(suffix='.typ', prefix=f".{output_path.stem}-", dir=output_path.parent)
+        source = Path(source)
+        partial = source.with_suffix('.pdf')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                f.write(typst_code)
+
+            for attempt in range(1, self.retries + 2):
+                try:
+                    self._run(source, partial)
+                    break
+                except CompileError as e:
+                    e.attempts = attempt
+                    if not e.transient or attempt > self.retries:
+                        raise
+                    time.sleep(self.retry_delay * attempt)
+
+            os.replace(partial, output_path)
+        finally:
+            source.unlink(missing_ok=True)
+            partial.unlink(missing_ok=True)
+            self.latency.record(time.perf_counter() - start)
+
+    def _run(self, source: Path, output_path: Path):
+        executable = shutil.which(self.executable)
+        if executable is None:
+            raise CompileError(f"could not run {self.executable}: not found", transient=False)
+        command = [executable, 'compile', '--root', self.root, str(source), str(output_path)]
+
+        try:
+            process = subprocess.Popen(
+                _limited(command, self.limits),
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True,
+                errors='replace',
+                start_new_session=True,
+            )
+        except OSError as e:
+            raise CompileError(f"could not run {self.executable}: {e.strerror or e}", transient=e.errno in (errno.EAGAIN, errno.ENOMEM))
+
+        try:
+            _, stderr = process.communicate(timeout=self.limits.timeout)
+        except subprocess.TimeoutExpired:
+            os.killpg(process.pid, signal.SIGKILL)
+            _, stderr = process.communicate()
+            raise CompileError(f"typst timed out after {self.limits.timeout:g}s", process.returncode, stderr, parse_typst_diagnostics(stderr), timed_out=True)
+
+        diagnostics = parse_typst_diagnostics(stderr)
+
+        if process.returncode < 0:
+            raise CompileError(f"typst was killed by signal {-process.returncode}", process.returncode, stderr, diagnostics)
+
+        if process.returncode != 0:
+            errors = [diagnostic for diagnostic in diagnostics if diagnostic.severity == 'error']
+            if errors:
+                message = f"line {errors[0].line}: {errors[0].message}" if errors[0].line else errors[0].message
+            else:
+                message = stderr.strip() or f"typst exited with status {process.returncode}"
+            raise CompileError(message, process.returncode, stderr, diagnostics)
+
+        if not output_path.exists():
+            raise CompileError(f"typst did not write {output_path}", process.returncode, stderr, diagnostics)
+
+    def metrics(self) -> dict:
+        return self.latency.summary()
+
+
+def build_pdf(typst_code: str, output_path: Path, image_path=None, compiler: TypstCompiler | None = None):
+    output_path = Path(output_path)
+
+    if image_path:
+        image_path = Path(image_path)
+        rel_image_path = image_path.relative_to(output_path.parent) if image_path.is_absolute() else image_path
+        typst_code = typst_code.replace(str(image_path), str(rel_image_path))
+
+    (compiler or TypstCompiler()).compile(typst_code, output_path)
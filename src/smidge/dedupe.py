@@ -0,0 +1,128 @@
+import hashlib
+import random
+import re
+import sys
+from collections import defaultdict
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Iterable
+
+from src.smidge import Recipe
+from src.smidge.shopping import iter_ingredients, name_key, parse_ingredient
+
+
+_PRIME = (1 << 61) - 1
+_WORD = re.compile(r'\w+')
+_SHINGLE_SIZE = 3
+_CACHE_BYTES = 64 * 1024 * 1024
+
+
+@dataclass
+class DuplicateCluster:
+    keep: int
+    duplicates: list[tuple[int, float]] = field(default_factory=list)
+
+
+@lru_cache(maxsize=8192)
+def _ingredient_name(text: str) -> str:
+    return name_key(parse_ingredient(text).name)
+
+
+def recipe_features(recipe: Recipe) -> set[str]:
+    features = set()
+
+    for text in iter_ingredients([recipe]):
+        name = _ingredient_name(text)
+        if name:
+            features.add('i:' + name)
+
+    for component in recipe.components:
+        for step in component.steps:
+            words = _WORD.findall(step.text.lower())
+            if not words:
+                continue
+            for i in range(max(1, len(words) - _SHINGLE_SIZE + 1)):
+                features.add('s:' + ' '.join(words[i:i + _SHINGLE_SIZE]))
+
+    return features
+
+
+def _bands_for(threshold: float, num_perm: int) -> int:
+    divisors = [bands for bands in range(1, num_perm + 1) if num_perm % bands == 0]
+    below = [bands for bands in divisors if (1 / bands) ** (bands / num_perm) <= threshold]
+    return min(below) if below else num_perm
+
+
+class MinHasher:
+    def __init__(self, num_perm: int = 128, seed: int = 1):
+        rng = random.Random(seed)
+        self.num_perm = num_perm
+        self._permutations = [(rng.randrange(1, _PRIME), rng.randrange(_PRIME)) for _ in range(num_perm)]
+        self._vectors = {}
+        self._cache_size = max(1, _CACHE_BYTES // (num_perm * (8 + sys.getsizeof(_PRIME))))
+
+    def _vector(self, feature: str) -> list[int]:
+        vector = self._vectors.get(feature)
+        if vector is None:
+            if len(self._vectors) >= self._cache_size:
+                self._vectors.clear()
+            value = int.from_bytes(hashlib.blake2b(feature.encode(), digest_size=8).digest())
+            vector = self._vectors[feature] = [(a * value + b) % _PRIME for a, b in self._permutations]
+        return vector
+
+    def signature(self, features: Iterable[str]) -> list[int] | None:
+        vectors = [self._vector(feature) for feature in features]
+        if not vectors:
+            return None
+        return list(map(min, zip(*vectors)))
+
+
+def similarity(a: list[int], b: list[int]) -> float:
+    return sum(1 for x, y in zip(a, b) if x == y) / len(a)
+
+
+def find_duplicates(recipes: Iterable[Recipe], threshold: float = 0.8, num_perm: int = 128, bands: int | None = None) -> list[DuplicateCluster]:
+    hasher = MinHasher(num_perm)
+    signatures = [hasher.signature(recipe_features(recipe)) for recipe in recipes]
+
+    bands = bands or _bands_for(threshold, num_perm)
+    rows = num_perm // bands
+
+    parent = list(range(len(signatures)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def union(i, j):
+        i, j = find(i), find(j)
+        if i != j:
+            parent[max(i, j)] = min(i, j)
+
+    for band in range(bands):
+        buckets = defaultdict(list)
+        for i, signature in enumerate(signatures):
+            if signature is not None:
+                buckets[tuple(signature[band * rows:(band + 1) * rows])].append(i)
+
+        for members in buckets.values():
+            for previous, current in zip(members, members[1:]):
+                for other in {members[0], previous}:
+                    if find(other) != find(current) and similarity(signatures[other], signatures[current]) >= threshold:
+                        union(other, current)
+
+    clusters = {}
+    for i in range(len(signatures)):
+        root = find(i)
+        if root != i:
+            cluster = clusters.setdefault(root, DuplicateCluster(keep=root))
+            cluster.duplicates.append((i, similarity(signatures[root], signatures[i])))
+
+    return sorted(clusters.values(), key=lambda cluster: cluster.keep)
+
+
+def drop_duplicates(recipes: list[Recipe], threshold: float = 0.8) -> list[Recipe]:
+    duplicates = {i for cluster in find_duplicates(recipes, threshold) for i, _ in cluster.duplicates}
+    return [recipe for i, recipe in enumerate(recipes) if i not in duplicates]
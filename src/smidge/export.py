@@ -0,0 +1,76 @@
+import csv
+import json
+from dataclasses import asdict
+from pathlib import Path
+from typing import Iterable, Iterator, TextIO
+
+from src.smidge import parse_recipe, Recipe, RecipeLimitError
+from src.smidge.shopping import iter_ingredients
+from src.smidge.vocabulary import cached_annotator
+
+
+CSV_FIELDS = ['path', 'title', 'component', 'kind', 'step', 'position', 'text']
+
+
+def iter_recipes(input_files: Iterable[str], on_error=None) -> Iterator[tuple[str, Recipe]]:
+    for input_file in input_files:
+        try:
+            recipe = parse_recipe(Path(input_file).read_text())
+        except RecipeLimitError as e:
+            if on_error is not None:
+                on_error(input_file, e)
+            continue
+        if recipe:
+            yield input_file, recipe
+
+
+def recipe_to_dict(recipe: Recipe, path: str | None = None) -> dict:
+    record = asdict(recipe)
+    if path is not None:
+        record = {'path': path, **record}
+    return record
+
+
+def recipe_to_rows(recipe: Recipe, path: str | None = None) -> Iterator[list]:
+    for component in recipe.components:
+        for position, ingredient in enumerate(component.ingredients or [], 1):
+            yield [path, recipe.title, component.name, 'ingredient', None, position, ingredient]
+
+        for step_number, step in enumerate(component.steps, 1):
+            yield [path, recipe.title, component.name, 'step', step_number, step_number, step.text]
+
+            for position, ingredient in enumerate(step.ingredients or [], 1):
+                yield [path, recipe.title, component.name, 'ingredient', step_number, position, ingredient]
+
+
+def write_jsonl(recipes: Iterable[tuple[str, Recipe]], out: TextIO, matcher=None) -> int:
+    annotate = cached_annotator(matcher) if matcher else None
+
+    count = 0
+    for path, recipe in recipes:
+        record = recipe_to_dict(recipe, path)
+        if annotate:
+            annotations = [asdict(annotate(text)) for text in iter_ingredients([recipe])]
+            record['annotations'] = annotations
+            record['allergens'] = sorted({allergen for annotation in annotations for allergen in annotation['allergens']})
+        out.write(json.dumps(record, ensure_ascii=False, default=str))
+        out.write('\n')
+        count += 1
+    return count
+
+
+def write_csv(recipes: Iterable[tuple[str, Recipe]], out: TextIO, matcher=None) -> int:
+    annotate = cached_annotator(matcher) if matcher else None
+
+    writer = csv.writer(out)
+    writer.writerow(CSV_FIELDS + ['ingredients', 'allergens'] if annotate else CSV_FIELDS)
+
+    count = 0
+    for path, recipe in recipes:
+        for row in recipe_to_rows(recipe, path):
+            if annotate:
+                annotation = annotate(row[-1]) if row[3] == 'ingredient' else None
+                row += [';'.join(annotation.ingredients), ';'.join(annotation.allergens)] if annotation else ['', '']
+            writer.writerow(row)
+        count += 1
+    return count
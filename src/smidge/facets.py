@@ -0,0 +1,278 @@
+import re
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from dataclasses import dataclass, field
+from functools import lru_cache
+
+from src.smidge import Recipe
+from src.smidge.shopping import split_quantity
+
+
+class QueryError(ValueError):
+    pass
+
+
+@dataclass
+class RecipeFacets:
+    prep_time: float | None = None
+    cook_time: float | None = None
+    total_time: float | None = None
+    servings: int | None = None
+    categories: list[str] = field(default_factory=list)
+    tags: list[str] = field(default_factory=list)
+
+
+@dataclass
+class Condition:
+    field: str
+    op: str
+    value: object
+
+
+NUMERIC_FACETS = {
+    'prep time': 'prep_time',
+    'cook time': 'cook_time',
+    'total time': 'total_time',
+    'servings': 'servings',
+}
+
+FIELD_ALIASES = {
+    'prep': 'prep time', 'preparation time': 'prep time',
+    'cook': 'cook time', 'cooking time': 'cook time',
+    'total': 'total time', 'time': 'total time',
+    'serves': 'servings', 'yield': 'servings', 'makes': 'servings',
+    'categories': 'category',
+    'tag': 'tags', 'keywords': 'tags',
+}
+
+DURATION_UNITS = {
+    's': 1 / 60, 'sec': 1 / 60, 'secs': 1 / 60, 'second': 1 / 60, 'seconds': 1 / 60,
+    'm': 1, 'min': 1, 'mins': 1, 'minute': 1, 'minutes': 1,
+    'h': 60, 'hr': 60, 'hrs': 60, 'hour': 60, 'hours': 60,
+    'd': 1440, 'day': 1440, 'days': 1440,
+}
+
+_ISO_DURATION = re.compile(
+    r'^P(?:(?P<days>\d+)D)?(?:T(?:(?P<hours>\d+(?:\.\d+)?)H)?(?:(?P<minutes>\d+(?:\.\d+)?)M)?(?:(?P<seconds>\d+(?:\.\d+)?)S)?)?$',
+    re.IGNORECASE,
+)
+_CLOCK = re.compile(r'^(?P<hours>\d+):(?P<minutes>[0-5]\d)$')
+_RANGE = re.compile(r'(\d)\s*(?:-|–|to)\s*\d+(?:\.\d+)?', re.IGNORECASE)
+_DURATION_UNIT = re.compile(r'^(?P<unit>[a-zA-Z]+)\.?\s*(?:(?:and|,)\s*)?')
+_FIRST_NUMBER = re.compile(r'\d+')
+_CLAUSE = re.compile(
+    r'\s*(?P<field>[^<>=!"\']+?)\s*(?P<op><=|>=|!=|==?|<|>)\s*'
+    r'(?P<value>"[^"]*"|\'[^\']*\'|.*?)\s*(?:(?P<conjunction>\sand)(?=\s|$)\s*|$)',
+    re.IGNORECASE,
+)
+
+
+@lru_cache(maxsize=1024)
+def _field_key(name: str) -> str:
+    key = re.sub(r'[\s_-]+', ' ', str(name)).strip().lower()
+    return FIELD_ALIASES.get(key, key)
+
+
+def parse_duration(value) -> float | None:
+    if isinstance(value, bool) or value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    return _parse_duration_text(str(value).strip())
+
+
+@lru_cache(maxsize=4096)
+def _parse_duration_text(text: str) -> float | None:
+    match = _ISO_DURATION.match(text)
+    if match and any(match.groups()):
+        return (float(match['days'] or 0) * 1440 + float(match['hours'] or 0) * 60
+                + float(match['minutes'] or 0) + float(match['seconds'] or 0) / 60)
+
+    match = _CLOCK.match(text)
+    if match:
+        return float(int(match['hours']) * 60 + int(match['minutes']))
+
+    start = re.search(r'\d|[½⅓⅔¼¾⅛⅜⅝⅞]', text)
+    if start is None:
+        return None
+    rest = _RANGE.sub(r'\1', text[start.start():])
+
+    total = None
+    while rest:
+        quantity, rest = split_quantity(rest)
+        if quantity is None:
+            break
+        quantity = float(quantity)
+
+        match = _DURATION_UNIT.match(rest)
+        unit = DURATION_UNITS.get(match['unit'].lower()) if match else None
+        if unit is None:
+            return total if total is not None else quantity
+        total = (total or 0) + quantity * unit
+        rest = rest[match.end():]
+
+    return total
+
+
+def parse_servings(value) -> int | None:
+    if isinstance(value, bool) or value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+
+    match = _FIRST_NUMBER.search(str(value))
+    return int(match.group()) if match else None
+
+
+def _terms(value) -> list[str]:
+    if isinstance(value, dict) or value is None:
+        return []
+    values = value if isinstance(value, list) else [value]
+    return [str(item).strip() for item in values if item is not None and not isinstance(item, (dict, list))]
+
+
+def recipe_facets(recipe: Recipe) -> RecipeFacets:
+    facets = RecipeFacets()
+
+    for key, value in (recipe.metadata or {}).items():
+        name = _field_key(key)
+        if name in ('prep time', 'cook time', 'total time'):
+            setattr(facets, NUMERIC_FACETS[name], parse_duration(value))
+        elif name == 'servings':
+            facets.servings = parse_servings(value)
+        elif name == 'category':
+            facets.categories = _terms(value)
+        elif name == 'tags':
+            tags = value.split(',') if isinstance(value, str) else _terms(value)
+            facets.tags = [tag.strip() for tag in tags if tag.strip()]
+
+    if facets.total_time is None and (facets.prep_time is not None or facets.cook_time is not None):
+        facets.total_time = (facets.prep_time or 0) + (facets.cook_time or 0)
+
+    return facets
+
+
+def _condition(name: str, op: str, raw) -> Condition:
+    if name in NUMERIC_FACETS:
+        value = parse_servings(raw) if name == 'servings' else parse_duration(raw)
+        if value is None:
+            raise QueryError(f"expected a number for {name}, got {raw!r}")
+    elif op in ('<', '<=', '>', '>='):
+        raise QueryError(f"{name} cannot be compared with {op}")
+    else:
+        value = str(raw).casefold()
+
+    return Condition(field=name, op=op, value=value)
+
+
+def parse_query(query: str) -> list[Condition]:
+    conditions = []
+    position = 0
+    query = query.strip()
+    match = None
+
+    while position < len(query):
+        match = _CLAUSE.match(query, position)
+        if match is None or match.end() == position:
+            raise QueryError(f"invalid query near {query[position:position + 20]!r}")
+        position = match.end()
+
+        name = _field_key(match['field'])
+        op = '=' if match['op'] == '==' else match['op']
+        raw = match['value']
+        if raw[:1] in '"\'' and len(raw) > 1 and raw[-1] == raw[0]:
+            raw = raw[1:-1]
+        if not name or not raw:
+            raise QueryError(f"invalid condition {match.group().strip()!r}")
+
+        conditions.append(_condition(name, op, raw))
+
+    if match is not None and match['conjunction']:
+        raise QueryError("query ends with 'and'")
+
+    return conditions
+
+
+def where_conditions(where: dict) -> list[Condition]:
+    conditions = []
+
+    for key, expected in where.items():
+        name = _field_key(key)
+        values = [_condition(name, '=', value).value for value in (expected if isinstance(expected, list) else [expected])]
+        if len(values) == 1:
+            conditions.append(Condition(field=name, op='=', value=values[0]))
+        else:
+            conditions.append(Condition(field=name, op='in', value=values))
+
+    return conditions
+
+
+class FacetIndex:
+    def __init__(self, recipes):
+        self.recipes = list(recipes)
+        self._numeric = {}
+        self._postings = defaultdict(lambda: defaultdict(list))
+
+        numeric = defaultdict(list)
+        for i, recipe in enumerate(self.recipes):
+            facets = recipe_facets(recipe)
+
+            for name, attribute in NUMERIC_FACETS.items():
+                value = getattr(facets, attribute)
+                if value is not None:
+                    numeric[name].append((value, i))
+
+            for key, value in (recipe.metadata or {}).items():
+                name = _field_key(key)
+                if name not in NUMERIC_FACETS and name not in ('category', 'tags'):
+                    self._add_terms(name, _terms(value), i)
+
+            self._add_terms('category', facets.categories, i)
+            self._add_terms('tags', facets.tags, i)
+
+        for name, pairs in numeric.items():
+            pairs.sort()
+            self._numeric[name] = ([value for value, _ in pairs], [i for _, i in pairs])
+
+    def _add_terms(self, name: str, terms: list[str], i: int):
+        postings = self._postings[name]
+        for term in dict.fromkeys(term.casefold() for term in terms):
+            postings[term].append(i)
+
+    def _lookup(self, condition: Condition):
+        if condition.op == 'in':
+            return set().union(*(self._lookup(Condition(field=condition.field, op='=', value=value)) for value in condition.value))
+
+        if condition.field in NUMERIC_FACETS:
+            values, ids = self._numeric.get(condition.field, ([], []))
+            low, high = 0, len(values)
+            if condition.op in ('<', '<='):
+                high = (bisect_left if condition.op == '<' else bisect_right)(values, condition.value)
+            elif condition.op in ('>', '>='):
+                low = (bisect_right if condition.op == '>' else bisect_left)(values, condition.value)
+            else:
+                low, high = bisect_left(values, condition.value), bisect_right(values, condition.value)
+                if condition.op == '!=':
+                    return set(range(len(self.recipes))).difference(ids[low:high])
+            return ids[low:high]
+
+        ids = self._postings.get(condition.field, {}).get(condition.value, [])
+        if condition.op == '!=':
+            return set(range(len(self.recipes))).difference(ids)
+        return ids
+
+    def select(self, query: str | list[Condition]) -> list[int]:
+        conditions = parse_query(query) if isinstance(query, str) else query
+        if not conditions:
+            return list(range(len(self.recipes)))
+
+        matches = None
+        for ids in sorted((self._lookup(condition) for condition in conditions), key=len):
+            matches = set(ids) if matches is None else matches.intersection(ids)
+            if not matches:
+                break
+
+        return sorted(matches)
+
+    def filter(self, query: str | list[Condition]) -> list[Recipe]:
+        return [self.recipes[i] for i in self.select(query)]
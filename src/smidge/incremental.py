@@ -0,0 +1,294 @@
+from dataclasses import dataclass, field
+
+from src.smidge import (
+    Component,
+    DEFAULT_LIMITS,
+    ParseLimits,
+    Recipe,
+    RecipeLimitError,
+    _build_components,
+    _scan_lines,
+    _split_frontmatter,
+)
+
+
+@dataclass
+class RecipeChange:
+    title_changed: bool = False
+    metadata_changed: bool = False
+    changed_components: list[int] = field(default_factory=list)
+    changed_steps: dict[int, list[int]] = field(default_factory=dict)
+    removed_components: list[int] = field(default_factory=list)
+
+
+@dataclass
+class _Segment:
+    start: int
+    end: int
+    title: str | None = None
+    component: Component | None = None
+    subtitles: int = 0
+    leaks: bool = False
+
+
+def _ignore(*args):
+    pass
+
+
+def _exceeded(index, message):
+    raise RecipeLimitError(message)
+
+
+def _is_header(stripped_left: str, has_subtitles: bool) -> bool:
+    return stripped_left.startswith('+ ' if has_subtitles else '= ')
+
+
+def _split_segments(entries, start: int, end: int, has_subtitles: bool) -> list[tuple[_Segment, list]]:
+    segments = [(_Segment(start=start, end=end), [])]
+
+    for entry in entries:
+        if _is_header(entry[2], has_subtitles):
+            segments[-1][0].end = entry[0]
+            segments.append((_Segment(start=entry[0], end=end), []))
+        segments[-1][1].append(entry)
+
+    return segments
+
+
+def _leaks(entries) -> bool:
+    for _, indent, stripped_left in entries[1:]:
+        if stripped_left.startswith('# '):
+            return False
+        if indent == 2 and (stripped_left.startswith('- ') or stripped_left.startswith('* ')):
+            return True
+    return False
+
+
+def _reuse_steps(old: Component, new: Component) -> list[int]:
+    changed = []
+    for i, step in enumerate(new.steps):
+        if i < len(old.steps) and old.steps[i] == step:
+            new.steps[i] = old.steps[i]
+        else:
+            changed.append(i)
+    return changed
+
+
+def _segment_title(entries) -> str | None:
+    title = None
+    for _, _, stripped_left in entries:
+        if stripped_left.startswith('= '):
+            title = stripped_left[2:].strip()
+    return title
+
+
+def _count_subtitles(entries) -> int:
+    return sum(1 for _, _, stripped_left in entries if stripped_left.startswith('+ '))
+
+
+def _reconcile(old: list[Component], new: list[Component], base: int) -> RecipeChange:
+    change = RecipeChange()
+
+    prefix = 0
+    while prefix < min(len(old), len(new)) and old[prefix] == new[prefix]:
+        new[prefix] = old[prefix]
+        prefix += 1
+
+    suffix = 0
+    while suffix < min(len(old), len(new)) - prefix and old[-1 - suffix] == new[-1 - suffix]:
+        new[-1 - suffix] = old[-1 - suffix]
+        suffix += 1
+
+    for i in range(prefix, len(new) - suffix):
+        change.changed_components.append(base + i)
+        if i < len(old) - suffix:
+            changed_steps = _reuse_steps(old[i], new[i])
+            if len(changed_steps) < len(new[i].steps):
+                change.changed_steps[base + i] = changed_steps
+
+    change.removed_components = [base + i for i in range(len(new) - suffix, len(old) - suffix)]
+    return change
+
+
+class IncrementalParser:
+    def __init__(self, text: str = '', limits: ParseLimits = DEFAULT_LIMITS):
+        self.text = text
+        self.limits = limits
+        self.recipe = None
+        self._lines = text.split('\n')
+        self._segments = []
+        self._metadata = {}
+        self._prefix_end = 0
+        self._has_subtitles = False
+        self._subtitle_count = 0
+        self._leak_count = 0
+        self._incremental = False
+        self._full_parse()
+
+    @property
+    def components(self) -> list[Component]:
+        return [segment.component for segment in self._segments if segment.component is not None]
+
+    def edit(self, offset: int, removed: int, inserted: str) -> RecipeChange:
+        if offset < 0 or removed < 0 or offset + removed > len(self.text):
+            raise ValueError('edit is outside of the document')
+
+        old_text = self.text
+        first = old_text.count('\n', 0, offset)
+        last = first + old_text.count('\n', offset, offset + removed)
+
+        line_start = old_text.rfind('\n', 0, offset) + 1
+        line_end = old_text.find('\n', offset + removed)
+        if line_end == -1:
+            line_end = len(old_text)
+
+        new_lines = (old_text[line_start:offset] + inserted + old_text[offset + removed:line_end]).split('\n')
+
+        self.text = old_text[:offset] + inserted + old_text[offset + removed:]
+        self._lines[first:last + 1] = new_lines
+
+        if not self._incremental or first < self._prefix_end:
+            return self._full_parse()
+
+        return self._reparse(first, last, len(new_lines) - (last - first + 1))
+
+    def _full_parse(self) -> RecipeChange:
+        old_recipe = self.recipe
+        old_components = self.components
+
+        self.recipe = None
+        self._segments = []
+        self._incremental = False
+
+        offset = self.text[:len(self.text) - len(self.text.lstrip())].count('\n')
+        lines = self.text.strip().split('\n')
+
+        metadata, content_start, terminated = _split_frontmatter(lines, self.limits, _ignore, _exceeded)
+        entries, has_subtitles = _scan_lines(lines, content_start, len(lines), self.limits, _exceeded)
+        _, components = _build_components(entries, has_subtitles, _ignore)
+
+        body_start = content_start + offset
+        entries = [(index + offset, indent, stripped_left) for index, indent, stripped_left in entries]
+        segments = _split_segments(entries, body_start, len(self._lines), has_subtitles)
+
+        for i, (segment, segment_entries) in enumerate(segments):
+            segment.title = _segment_title(segment_entries)
+            segment.subtitles = _count_subtitles(segment_entries)
+            if i > 0:
+                segment.component = components[i - 1]
+                segment.leaks = _leaks(segment_entries)
+
+        change = _reconcile(old_components, components, 0)
+        for segment, component in zip(segments[1:], components):
+            segment[0].component = component
+
+        self._segments = [segment for segment, _ in segments]
+        self._metadata = metadata
+        self._has_subtitles = has_subtitles
+        self._subtitle_count = sum(segment.subtitles for segment in self._segments)
+        self._leak_count = sum(1 for segment in self._segments if segment.leaks)
+        self._prefix_end = body_start if content_start else offset + 1
+        self._incremental = terminated
+
+        return self._finish(old_recipe, change)
+
+    def _reparse(self, first: int, last: int, delta: int) -> RecipeChange:
+        if self._leak_count:
+            return self._full_parse()
+
+        segments = self._segments
+
+        lo = self._segment_at(first)
+        hi = self._segment_at(last)
+        if lo > 0 and segments[lo].start == first:
+            lo -= 1
+
+        region_start = segments[lo].start
+        region_end = segments[hi].end + delta
+
+        region = self._lines[region_start:region_end]
+
+        tail = len(self._lines) - 1
+        while tail >= region_start and not self._lines[tail].strip():
+            tail -= 1
+        if region_start <= tail < region_end:
+            region[tail - region_start] = region[tail - region_start].rstrip()
+
+        try:
+            entries, _ = _scan_lines(region, 0, len(region), self.limits, _exceeded)
+        except RecipeLimitError:
+            return self._full_parse()
+
+        entries = [(index + region_start, indent, stripped_left) for index, indent, stripped_left in entries]
+
+        new_segments = _split_segments(entries, region_start, region_end, self._has_subtitles)
+
+        subtitle_count = self._subtitle_count - sum(segment.subtitles for segment in segments[lo:hi + 1])
+        subtitle_count += _count_subtitles(entries)
+        if (subtitle_count > 0) != self._has_subtitles:
+            return self._full_parse()
+
+        if lo > 0:
+            new_segments = new_segments[1:]
+
+        for i, (segment, segment_entries) in enumerate(new_segments):
+            segment.title = _segment_title(segment_entries)
+            segment.subtitles = _count_subtitles(segment_entries)
+            if lo > 0 or i > 0:
+                _, components = _build_components(segment_entries, self._has_subtitles, _ignore)
+                segment.component = components[0]
+                if _leaks(segment_entries):
+                    return self._full_parse()
+
+        old_recipe = self.recipe
+        base = sum(1 for segment in segments[:lo] if segment.component is not None)
+        old_region = [segment.component for segment in segments[lo:hi + 1] if segment.component is not None]
+        new_region = [segment.component for segment, _ in new_segments if segment.component is not None]
+
+        change = _reconcile(old_region, new_region, base)
+        for segment, component in zip([segment for segment, _ in new_segments if segment.component is not None], new_region):
+            segment.component = component
+
+        for segment in segments[hi + 1:]:
+            segment.start += delta
+            segment.end += delta
+
+        segments[lo:hi + 1] = [segment for segment, _ in new_segments]
+        self._subtitle_count = subtitle_count
+
+        return self._finish(old_recipe, change)
+
+    def _segment_at(self, line: int) -> int:
+        segments = self._segments
+        low, high = 0, len(segments) - 1
+        while low < high:
+            middle = (low + high + 1) // 2
+            if segments[middle].start <= line:
+                low = middle
+            else:
+                high = middle - 1
+        return low
+
+    def _finish(self, old_recipe: Recipe | None, change: RecipeChange) -> RecipeChange:
+        title = None
+        for segment in reversed(self._segments):
+            if segment.title is not None:
+                title = segment.title
+                break
+
+        old_title = old_recipe.title if old_recipe else None
+        old_metadata = old_recipe.metadata if old_recipe else None
+
+        if title is None:
+            self.recipe = None
+        else:
+            self.recipe = Recipe(title=title, components=self.components, metadata=self._metadata)
+
+        new_metadata = self.recipe.metadata if self.recipe else None
+        if old_metadata == new_metadata and old_recipe is not None and self.recipe is not None:
+            self.recipe.metadata = old_metadata
+            self._metadata = old_metadata
+
+        change.title_changed = old_title != title
+        change.metadata_changed = old_metadata != new_metadata
+        return change
@@ -1,38 +1,52 @@
 import argparse
+import json
 import subprocess
+import sys
 import tempfile
+from dataclasses import asdict
 from pathlib import Path
 
-from src.smidge import parse_recipe, Recipe
+from src.smidge import Recipe
+from src.smidge.build import BuildError, build, load_build_file
+from src.smidge.check import check_files, reports_to_json, reports_to_junit, reports_to_text
+from src.smidge.compile import CompileError, TypstCompiler, build_pdf
+from src.smidge.dedupe import drop_duplicates, find_duplicates
+from src.smidge.export import iter_recipes, write_csv, write_jsonl
+from src.smidge.facets import FacetIndex, QueryError
 from src.smidge.rendering import recipe_to_typst
+from src.smidge.serve import MAX_BODY_SIZE, RenderService, make_server
+from src.smidge.shopping import shopping_list, shopping_list_to_text
+from src.smidge.snapshot import build_manifest, diff_manifests, diff_to_text, read_manifest
+from src.smidge.vocabulary import allergen_map, load_matcher
 
 
-def build_pdf(typst_code: str, output_path: Path, image_path=None):
-    temp_typst = output_path.with_suffix('.typ')
+def skip_recipe(path: str, error: Exception):
+    print(f"smidge: skipping {path}: {error}", file=sys.stderr)
 
-    if image_path:
-        image_path = Path(image_path)
-        rel_image_path = image_path.relative_to(temp_typst.parent) if image_path.is_absolute() else image_path
-        typst_code = typst_code.replace(str(image_path), str(rel_image_path))
 
-    temp_typst.write_text(typst_code)
-    subprocess.run(['typst', 'compile', '--root', '/', str(temp_typst), str(output_path)])
-    temp_typst.unlink()
+def load_recipes(input_files: list[str], where: str | None = None, skip_duplicates: bool = False) -> list[Recipe]:
+    recipes = [recipe for _, recipe in iter_recipes(input_files, skip_recipe)]
+    if skip_duplicates:
+        recipes = drop_duplicates(recipes)
+    return FacetIndex(recipes).filter(where) if where else recipes
 
 
-def load_recipes(input_files: list[str]) -> list[Recipe]:
-    recipes = []
-    for input_file in input_files:
-        input_path = Path(input_file)
-        recipe_text = input_path.read_text()
-        recipe = parse_recipe(recipe_text)
-        if recipe:
-            recipes.append(recipe)
-    return recipes
+def pdf_command(args: argparse.Namespace):
+    try:
+        recipes = load_recipes(args.input, where=args.where, skip_duplicates=args.skip_duplicates)
+    except QueryError as e:
+        print(f"smidge: {e}", file=sys.stderr)
+        return 1
 
+    if args.where and not recipes:
+        print(f"smidge: no recipes match {args.where!r}", file=sys.stderr)
+        return 1
 
-def pdf_command(args: argparse.Namespace):
-    recipes = load_recipes(args.input)
+    try:
+        allergens = allergen_map(recipes, load_matcher(args.allergens)) if args.allergens else None
+    except (OSError, ValueError) as e:
+        print(f"smidge: {e}", file=sys.stderr)
+        return 1
 
     if args.output:
         output_path = Path(args.output)
@@ -41,13 +55,33 @@ def pdf_command(args: argparse.Namespace):
     else:
         output_path = Path('smidge.pdf')
 
-    typst_code = recipe_to_typst(recipes, title=args.title, subtitle=args.subtitle, image=args.image)
-    build_pdf(typst_code, output_path)
+    typst_code = recipe_to_typst(recipes, title=args.title, subtitle=args.subtitle, image=args.image, shopping_list=args.shopping_list, compact=args.compact, allergens=allergens)
+
+    try:
+        build_pdf(typst_code, output_path)
+    except CompileError as e:
+        print(f"smidge: {e}", file=sys.stderr)
+        return 1
 
 
 def print_command(args: argparse.Namespace):
-    recipes = load_recipes(args.input)
-    typst_code = recipe_to_typst(recipes, title=args.title, subtitle=args.subtitle, image=args.image)
+    try:
+        recipes = load_recipes(args.input, where=args.where, skip_duplicates=args.skip_duplicates)
+    except QueryError as e:
+        print(f"smidge: {e}", file=sys.stderr)
+        return 1
+
+    if args.where and not recipes:
+        print(f"smidge: no recipes match {args.where!r}", file=sys.stderr)
+        return 1
+
+    try:
+        allergens = allergen_map(recipes, load_matcher(args.allergens)) if args.allergens else None
+    except (OSError, ValueError) as e:
+        print(f"smidge: {e}", file=sys.stderr)
+        return 1
+
+    typst_code = recipe_to_typst(recipes, title=args.title, subtitle=args.subtitle, image=args.image, shopping_list=args.shopping_list, compact=args.compact, allergens=allergens)
 
     with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as tmp:
         tmp_path = Path(tmp.name)
@@ -55,8 +89,161 @@ def print_command(args: argparse.Namespace):
     try:
         build_pdf(typst_code, tmp_path)
         subprocess.run(['lp', str(tmp_path)])
+    except CompileError as e:
+        print(f"smidge: {e}", file=sys.stderr)
+        return 1
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+
+def check_command(args: argparse.Namespace):
+    reports = check_files(args.input, jobs=args.jobs)
+
+    if args.format == 'json':
+        output = reports_to_json(reports)
+    elif args.format == 'junit':
+        output = reports_to_junit(reports, strict=args.strict)
+    else:
+        output = reports_to_text(reports)
+
+    if args.output:
+        Path(args.output).write_text(output)
+    else:
+        sys.stdout.write(output)
+
+    return 1 if any(report.failures(args.strict) for report in reports) else 0
+
+
+def export_command(args: argparse.Namespace):
+    write = write_csv if args.format == 'csv' else write_jsonl
+
+    try:
+        matcher = load_matcher(args.vocabulary) if args.vocabulary else None
+    except (OSError, ValueError) as e:
+        print(f"smidge: {e}", file=sys.stderr)
+        return 1
+
+    if args.output:
+        with open(args.output, 'w', newline='' if args.format == 'csv' else None) as out:
+            write(iter_recipes(args.input, skip_recipe), out, matcher=matcher)
+    else:
+        write(iter_recipes(args.input, skip_recipe), sys.stdout, matcher=matcher)
+
+
+def vocabulary_command(args: argparse.Namespace):
+    try:
+        matcher = load_matcher(args.vocabulary)
+    except (OSError, ValueError) as e:
+        print(f"smidge: {e}", file=sys.stderr)
+        return 1
+
+    matcher.save(args.output)
+    print(f"{len(matcher.entries)} entries written to {args.output}", file=sys.stderr)
+
+
+def shopping_list_command(args: argparse.Namespace):
+    output = shopping_list_to_text(shopping_list(load_recipes(args.input)))
+
+    if args.output:
+        Path(args.output).write_text(output)
+    else:
+        sys.stdout.write(output)
+
+
+def dedupe_command(args: argparse.Namespace):
+    loaded = list(iter_recipes(args.input, skip_recipe))
+    paths = [path for path, _ in loaded]
+    clusters = find_duplicates([recipe for _, recipe in loaded], threshold=args.threshold)
+
+    if args.format == 'json':
+        records = [
+            {'keep': paths[cluster.keep], 'duplicates': [{'path': paths[i], 'similarity': round(score, 3)} for i, score in cluster.duplicates]}
+            for cluster in clusters
+        ]
+        output = json.dumps(records, ensure_ascii=False) + '\n'
+    else:
+        output = ''
+        for cluster in clusters:
+            output += f"{paths[cluster.keep]}\n"
+            output += ''.join(f"  {score:.2f} {paths[i]}\n" for i, score in cluster.duplicates)
+
+    if args.output:
+        Path(args.output).write_text(output)
+    else:
+        sys.stdout.write(output)
+
+
+def snapshot_command(args: argparse.Namespace):
+    output = json.dumps(build_manifest(iter_recipes(args.input, skip_recipe)), ensure_ascii=False)
+
+    if args.output:
+        Path(args.output).write_text(output)
+    else:
+        sys.stdout.write(output + '\n')
+
+
+def diff_command(args: argparse.Namespace):
+    try:
+        diff = diff_manifests(read_manifest(args.old), read_manifest(args.new))
+    except (OSError, ValueError) as e:
+        print(f"smidge: {e}", file=sys.stderr)
+        return 2
+
+    if args.format == 'json':
+        sys.stdout.write(json.dumps(asdict(diff), ensure_ascii=False) + '\n')
+    else:
+        sys.stdout.write(diff_to_text(diff))
+
+    return 1 if diff else 0
+
+
+def serve_command(args: argparse.Namespace):
+    service = RenderService(workers=args.jobs, queue_size=args.queue, cache_size=args.cache, timeout=args.timeout)
+    try:
+        server = make_server(service, host=args.host, port=args.port, socket_path=args.socket, max_body_size=args.max_body)
+    except OSError as e:
+        service.close()
+        print(f"smidge: {e}", file=sys.stderr)
+        return 1
+
+    address = args.socket or f"http://{args.host}:{server.server_address[1]}"
+    print(f"Serving on {address} with {service.workers} worker(s)", file=sys.stderr)
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
     finally:
-        tmp_path.unlink()
+        server.server_close()
+        service.close()
+
+
+def build_command(args: argparse.Namespace):
+    compiler = TypstCompiler()
+
+    def compile_pdf(typst_code, output_path):
+        build_pdf(typst_code, output_path, compiler=compiler)
+
+    try:
+        spec = load_build_file(args.build_file)
+        results = build(spec, compile_pdf, jobs=args.jobs, selected=args.targets or None, on_error=skip_recipe)
+    except BuildError as e:
+        print(f"smidge: {e}", file=sys.stderr)
+        return 1
+
+    for target in spec.targets:
+        if f"compile:{target.name}" in results and results[f"compile:{target.name}"] is None:
+            print(f"{target.name}: {target.output}")
+
+    failures = [(name, error) for name, error in results.items() if error is not None]
+    for name, error in failures:
+        print(f"{name}: {error}", file=sys.stderr)
+
+    latency = compiler.metrics()
+    if latency['count']:
+        print(f"compiled {latency['count']} target(s): p50 {latency['p50']:.2f}s, p95 {latency['p95']:.2f}s, p99 {latency['p99']:.2f}s", file=sys.stderr)
+
+    return 1 if failures else 0
 
 
 def main():
@@ -69,6 +256,11 @@ def main():
     pdf_parser.add_argument('-t', '--title', default='Cookbook', help='Title for the cookbook (default: Cookbook)')
     pdf_parser.add_argument('-s', '--subtitle', help='Subtitle for the cookbook')
     pdf_parser.add_argument('-i', '--image', help='Path to cover image')
+    pdf_parser.add_argument('--shopping-list', action='store_true', help='Append a combined shopping list page')
+    pdf_parser.add_argument('-w', '--where', help='Only include recipes matching a query such as "Category=Dessert and total time < 45 min"')
+    pdf_parser.add_argument('--allergens', metavar='VOCABULARY', help='Show allergens next to each ingredient using a vocabulary file')
+    pdf_parser.add_argument('--skip-duplicates', action='store_true', help='Leave out near-duplicate recipes, keeping the first of each')
+    pdf_parser.add_argument('--compact', action='store_true', help='Emit the layout once as Typst functions for faster compiles')
     pdf_parser.set_defaults(func=pdf_command)
 
     print_parser = subparsers.add_parser('print', help='Print recipe')
@@ -76,11 +268,76 @@ def main():
     print_parser.add_argument('-t', '--title', default='Cookbook', help='Title for the cookbook (default: Cookbook)')
     print_parser.add_argument('-s', '--subtitle', help='Subtitle for the cookbook')
     print_parser.add_argument('-i', '--image', help='Path to cover image')
+    print_parser.add_argument('--shopping-list', action='store_true', help='Append a combined shopping list page')
+    print_parser.add_argument('-w', '--where', help='Only include recipes matching a query such as "Category=Dessert and total time < 45 min"')
+    print_parser.add_argument('--allergens', metavar='VOCABULARY', help='Show allergens next to each ingredient using a vocabulary file')
+    print_parser.add_argument('--skip-duplicates', action='store_true', help='Leave out near-duplicate recipes, keeping the first of each')
+    print_parser.add_argument('--compact', action='store_true', help='Emit the layout once as Typst functions for faster compiles')
     print_parser.set_defaults(func=print_command)
 
+    check_parser = subparsers.add_parser('check', help='Validate recipe files')
+    check_parser.add_argument('input', nargs='+', help='Input recipe file(s)')
+    check_parser.add_argument('-o', '--output', help='Write the report to a file instead of stdout')
+    check_parser.add_argument('-f', '--format', choices=['text', 'json', 'junit'], default='text', help='Report format (default: text)')
+    check_parser.add_argument('-j', '--jobs', type=int, help='Number of worker processes (default: CPU count)')
+    check_parser.add_argument('--strict', action='store_true', help='Treat warnings as failures')
+    check_parser.set_defaults(func=check_command)
+
+    export_parser = subparsers.add_parser('export', help='Export parsed recipes as JSON Lines or CSV')
+    export_parser.add_argument('input', nargs='+', help='Input recipe file(s)')
+    export_parser.add_argument('-o', '--output', help='Output file (default: stdout)')
+    export_parser.add_argument('-f', '--format', choices=['jsonl', 'csv'], default='jsonl', help='Output format (default: jsonl)')
+    export_parser.add_argument('--vocabulary', help='Annotate ingredients with canonical names and allergens from a vocabulary file')
+    export_parser.set_defaults(func=export_command)
+
+    vocabulary_parser = subparsers.add_parser('vocabulary', help='Compile a vocabulary file into a saved ingredient matcher')
+    vocabulary_parser.add_argument('vocabulary', help='JSON list of vocabulary terms')
+    vocabulary_parser.add_argument('-o', '--output', required=True, help='Output file for the compiled matcher')
+    vocabulary_parser.set_defaults(func=vocabulary_command)
+
+    shopping_parser = subparsers.add_parser('shopping-list', help='Combine the ingredients of several recipes')
+    shopping_parser.add_argument('input', nargs='+', help='Input recipe file(s)')
+    shopping_parser.add_argument('-o', '--output', help='Output file (default: stdout)')
+    shopping_parser.set_defaults(func=shopping_list_command)
+
+    dedupe_parser = subparsers.add_parser('dedupe', help='Find near-duplicate recipes')
+    dedupe_parser.add_argument('input', nargs='+', help='Input recipe file(s)')
+    dedupe_parser.add_argument('-o', '--output', help='Output file (default: stdout)')
+    dedupe_parser.add_argument('-f', '--format', choices=['text', 'json'], default='text', help='Output format (default: text)')
+    dedupe_parser.add_argument('-t', '--threshold', type=float, default=0.8, help='Minimum estimated similarity between 0 and 1 (default: 0.8)')
+    dedupe_parser.set_defaults(func=dedupe_command)
+
+    snapshot_parser = subparsers.add_parser('snapshot', help='Write a manifest of structural hashes for later diffs')
+    snapshot_parser.add_argument('input', nargs='+', help='Input recipe file(s)')
+    snapshot_parser.add_argument('-o', '--output', help='Output file (default: stdout)')
+    snapshot_parser.set_defaults(func=snapshot_command)
+
+    diff_parser = subparsers.add_parser('diff', help='Compare two snapshot manifests')
+    diff_parser.add_argument('old', help='Earlier snapshot manifest')
+    diff_parser.add_argument('new', help='Later snapshot manifest')
+    diff_parser.add_argument('-f', '--format', choices=['text', 'json'], default='text', help='Output format (default: text)')
+    diff_parser.set_defaults(func=diff_command)
+
+    serve_parser = subparsers.add_parser('serve', help='Run a local rendering service')
+    serve_parser.add_argument('--host', default='127.0.0.1', help='Address to listen on (default: 127.0.0.1)')
+    serve_parser.add_argument('-p', '--port', type=int, default=8080, help='Port to listen on (default: 8080)')
+    serve_parser.add_argument('--socket', help='Listen on a Unix socket instead of TCP')
+    serve_parser.add_argument('-j', '--jobs', type=int, help='Number of worker processes (default: CPU count)')
+    serve_parser.add_argument('--queue', type=int, default=32, help='Requests allowed to wait for a worker before rejecting (default: 32)')
+    serve_parser.add_argument('--cache', type=int, default=128, help='Number of rendered results to keep (default: 128)')
+    serve_parser.add_argument('--timeout', type=float, default=120.0, help='Seconds to wait for a render (default: 120)')
+    serve_parser.add_argument('--max-body', type=int, default=MAX_BODY_SIZE, help=f'Largest request body in bytes (default: {MAX_BODY_SIZE})')
+    serve_parser.set_defaults(func=serve_command)
+
+    build_parser = subparsers.add_parser('build', help='Build several cookbooks from a build file')
+    build_parser.add_argument('build_file', nargs='?', default='smidge.yaml', help='Build file (default: smidge.yaml)')
+    build_parser.add_argument('targets', nargs='*', help='Targets to build (default: all)')
+    build_parser.add_argument('-j', '--jobs', type=int, help='Number of concurrent compiles (default: CPU count)')
+    build_parser.set_defaults(func=build_command)
+
     args = parser.parse_args()
-    args.func(args)
+    return args.func(args)
 
 
 if __name__ == '__main__':
-    main()
+    sys.exit(main())
@@ -0,0 +1,47 @@
+import math
+import threading
+import time
+from collections import deque
+
+
+def percentile(values, p: float) -> float | None:
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(p / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def latency_summary(values) -> dict:
+    ordered = sorted(values)
+    return {
+        'count': len(ordered),
+        'p50': percentile(ordered, 50),
+        'p95': percentile(ordered, 95),
+        'p99': percentile(ordered, 99),
+        'max': ordered[-1] if ordered else None,
+    }
+
+
+class LatencyTracker:
+    def __init__(self, window: int = 1024):
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=window)
+        self._count = 0
+        self._started = time.monotonic()
+
+    def record(self, seconds: float):
+        with self._lock:
+            self._latencies.append(seconds)
+            self._count += 1
+
+    def summary(self) -> dict:
+        with self._lock:
+            latencies = list(self._latencies)
+            count = self._count
+        uptime = time.monotonic() - self._started
+        return {
+            **latency_summary(latencies),
+            'count': count,
+            'per_second': count / uptime if uptime else 0.0,
+        }
@@ -1,11 +1,82 @@
 from collections import defaultdict
+from functools import partial
+
+from src.smidge import shopping
+
+
+COMPACT_PREAMBLE = """#set list(spacing: 0.65em)
+
+#let smidge-footer(source) = context {
+  if source != none [#source #h(1fr) #counter(page).display() / #counter(page).final().at(0)]
+  else [#h(1fr) #counter(page).display() / #counter(page).final().at(0) #h(1fr)]
+}
+
+#let smidge-category(name) = {
+  v(2cm)
+  align(center, heading(level: 1, name))
+  pagebreak()
+}
+
+#let smidge-metadata(items) = align(center, text(size: 0.80em, fill: rgb("#222222"), {
+  for (i, chunk) in items.chunks(5).enumerate() {
+    if i > 0 { v(1em) }
+    let padding = range(5 - chunk.len()).map(_ => [])
+    grid(
+      columns: (auto,) * 5,
+      column-gutter: 3em,
+      row-gutter: 1em,
+      ..chunk.map(item => strong(item.at(0))), ..padding,
+      ..chunk.map(item => item.at(1)), ..padding,
+    )
+  }
+}))
+
+#let smidge-steps(steps, ingredients) = grid(
+  columns: (1.3fr, 1fr),
+  gutter: 3em,
+  enum(spacing: 1.5em, ..steps),
+  if ingredients != none { list(spacing: 1em, ..ingredients) },
+)
+
+#let smidge-recipe(title, metadata: none, components: ()) = {
+  align(center)[== #title]
+  v(2em)
+  if metadata != none {
+    if metadata.len() > 0 { smidge-metadata(metadata) }
+    v(2em)
+  }
+  for (i, component) in components.enumerate() {
+    if i > 0 { v(3em) }
+    let name = component.at("name", default: none)
+    if name != none {
+      heading(level: 3, name)
+      v(1em)
+    }
+    if component.at("per-step", default: false) {
+      for (n, step) in component.steps.enumerate(start: 1) {
+        if n > 1 { v(1em) }
+        smidge-steps((enum.item(n, step.at(0)),), step.at(1))
+      }
+    } else {
+      smidge-steps(component.steps, component.at("ingredients", default: none))
+    }
+  }
+}
+
+"""
+
+
+def recipe_to_typst(recipes, title: str | None = None, subtitle: str | None = None, image: str | None = None, shopping_list: bool = False, render_recipe=None, compact: bool = False, allergens: dict[str, list[str]] | None = None) -> str:
+    render_recipe = render_recipe or partial(_render_compact_recipe if compact else _render_single_recipe, allergens=allergens)
+    preamble = COMPACT_PREAMBLE if compact else ""
 
-
-def recipe_to_typst(recipes, title: str | None = None, subtitle: str | None = None, image: str | None = None) -> str:
     if len(recipes) == 1:
-        return _render_single_recipe(recipes[0])
+        typst = preamble + render_recipe(recipes[0])
+        if shopping_list:
+            typst += _render_shopping_list(recipes)
+        return typst
 
-    typst = "#set text(\n"
+    typst = preamble + "#set text(\n"
     typst += "  font: \"Source Serif Pro\",\n"
     typst += "  size: 12pt\n"
     typst += ")\n\n"
@@ -54,31 +125,60 @@ def recipe_to_typst(recipes, title: str | None = None, subtitle: str | None = No
         recipes_by_category[category].append(recipe)
 
     for category_index, (category, category_recipes) in enumerate(sorted(recipes_by_category.items())):
-        typst += "#set page(\n"
-        typst += "  footer: context [\n"
-        typst += "    #h(1fr)\n"
-        typst += "    #counter(page).display() / #counter(page).final().at(0)\n"
-        typst += "    #h(1fr)\n"
-        typst += "  ]\n"
-        typst += ")\n"
-        typst += "#v(2cm)\n"
-        typst += "#align(center)[\n"
-        typst += f"  #heading(level: 1)[{category}]\n"
-        typst += "]\n"
-        typst += "#pagebreak()\n\n"
+        if compact:
+            typst += "#set page(footer: smidge-footer(none))\n"
+            typst += f"#smidge-category([{category}])\n\n"
+        else:
+            typst += _render_category_page(category)
 
         for i, recipe in enumerate(category_recipes):
-            typst += _render_single_recipe(recipe)
+            typst += render_recipe(recipe)
             if i < len(category_recipes) - 1:
                 typst += "\n#pagebreak()\n\n"
 
         if category_index < len(recipes_by_category) - 1:
             typst += "\n#pagebreak()\n\n"
 
+    if shopping_list:
+        typst += _render_shopping_list(recipes)
+
+    return typst
+
+
+def _render_category_page(category):
+    typst = "#set page(\n"
+    typst += "  footer: context [\n"
+    typst += "    #h(1fr)\n"
+    typst += "    #counter(page).display() / #counter(page).final().at(0)\n"
+    typst += "    #h(1fr)\n"
+    typst += "  ]\n"
+    typst += ")\n"
+    typst += "#v(2cm)\n"
+    typst += "#align(center)[\n"
+    typst += f"  #heading(level: 1)[{category}]\n"
+    typst += "]\n"
+    typst += "#pagebreak()\n\n"
     return typst
 
 
-def _render_single_recipe(recipe):
+def _render_shopping_list(recipes):
+    return "\n#pagebreak()\n\n" + shopping.shopping_list_to_typst(shopping.shopping_list(recipes))
+
+
+def cached_recipe_renderer(compact: bool = False):
+    fragments = {}
+    render_single_recipe = _render_compact_recipe if compact else _render_single_recipe
+
+    def render_recipe(recipe):
+        fragment = fragments.get(id(recipe))
+        if fragment is None:
+            fragment = fragments[id(recipe)] = render_single_recipe(recipe)
+        return fragment
+
+    return render_recipe
+
+
+def _render_single_recipe(recipe, allergens: dict[str, list[str]] | None = None):
     source_value = recipe.metadata.get('Source') if hasattr(recipe, 'metadata') and recipe.metadata else None
 
     typst = "#set list(\n spacing: 0.65em,\n)\n\n"
@@ -165,7 +265,7 @@ def _render_single_recipe(recipe):
                 typst += "   #list(\n"
                 typst += "     spacing: 1em,\n"
                 for ingredient in component.ingredients:
-                    typst += f"     [{ingredient}],\n"
+                    typst += f"     [{_ingredient_markup(ingredient, allergens)}],\n"
                 typst += "   )\n"
             typst += " ]\n"
             typst += ")\n"
@@ -190,7 +290,7 @@ def _render_single_recipe(recipe):
                     typst += "   #list(\n"
                     typst += "     spacing: 1em,\n"
                     for ingredient in step.ingredients:
-                        typst += f"     [{ingredient}],\n"
+                        typst += f"     [{_ingredient_markup(ingredient, allergens)}],\n"
                     typst += "   )\n"
                 typst += " ]\n"
                 typst += ")\n"
@@ -201,4 +301,45 @@ def _render_single_recipe(recipe):
         if component_index < len(recipe.components) - 1:
             typst += "\n#v(3em)\n\n"
 
-    return typst
\ No newline at end of file
+    return typst
+
+
+def _ingredient_markup(ingredient: str, allergens: dict[str, list[str]] | None) -> str:
+    if not allergens or ingredient not in allergens:
+        return ingredient
+    return f"{ingredient} #h(1fr) #text(size: 0.80em, fill: rgb(\"#666666\"))[{', '.join(allergens[ingredient])}]"
+
+
+def _typst_array(items) -> str:
+    return f"({', '.join(items)},)" if items else "()"
+
+
+def _render_compact_recipe(recipe, allergens: dict[str, list[str]] | None = None):
+    metadata = recipe.metadata if hasattr(recipe, 'metadata') and recipe.metadata else None
+    source_value = metadata.get('Source') if metadata else None
+
+    typst = f"#set page(footer: smidge-footer([{source_value}]))\n" if source_value else "#set page(footer: smidge-footer(none))\n"
+
+    arguments = [f"[{recipe.title}]"]
+    if metadata:
+        arguments.append("metadata: " + _typst_array([f"([{key}], [{value}])" for key, value in metadata.items() if key != 'Source']))
+
+    components = []
+    for component in recipe.components:
+        fields = [f"name: [{component.name}]"] if component.name else []
+
+        if any(step.ingredients for step in component.steps):
+            fields.append("per-step: true")
+            steps = [f"([{step.text}], {_typst_array([f'[{_ingredient_markup(ingredient, allergens)}]' for ingredient in step.ingredients]) if step.ingredients else 'none'})" for step in component.steps]
+            fields.append("steps: " + _typst_array(steps))
+        else:
+            fields.append("steps: " + _typst_array([f"[{step.text}]" for step in component.steps]))
+            if component.ingredients:
+                fields.append("ingredients: " + _typst_array([f"[{_ingredient_markup(ingredient, allergens)}]" for ingredient in component.ingredients]))
+
+        components.append(f"({', '.join(fields)})")
+
+    if components:
+        arguments.append("components: " + _typst_array(components))
+
+    return typst + f"#smidge-recipe({', '.join(arguments)})\n"
@@ -0,0 +1,292 @@
+import errno
+import hashlib
+import json
+import os
+import socketserver
+import stat
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+import yaml
+
+from src.smidge import parse_recipe, RecipeLimitError
+from src.smidge.compile import CompileError, TypstCompiler, build_pdf
+from src.smidge.export import recipe_to_dict
+from src.smidge.metrics import LatencyTracker
+from src.smidge.rendering import recipe_to_typst
+
+
+MAX_BODY_SIZE = 8 * 1024 * 1024
+
+ROUTES = {
+    '/parse': ('parse', 'application/json'),
+    '/typst': ('typst', 'text/plain; charset=utf-8'),
+    '/pdf': ('pdf', 'application/pdf'),
+}
+
+
+class RenderError(ValueError):
+    pass
+
+
+class Overloaded(Exception):
+    pass
+
+
+def _render(kind: str, texts: list[str], many: bool, title: str | None, subtitle: str | None) -> bytes:
+    recipes = []
+    for text in texts:
+        try:
+            recipe = parse_recipe(text)
+        except (yaml.YAMLError, RecipeLimitError) as e:
+            raise RenderError(str(e))
+        if recipe is None:
+            raise RenderError('recipe has no title')
+        recipes.append(recipe)
+
+    if kind == 'parse':
+        records = [recipe_to_dict(recipe) for recipe in recipes]
+        return json.dumps(records if many else records[0], ensure_ascii=False, default=str).encode()
+
+    typst_code = recipe_to_typst(recipes, title=title, subtitle=subtitle)
+    if kind == 'typst':
+        return typst_code.encode()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        output_path = Path(tmp) / 'recipe.pdf'
+        try:
+            build_pdf(typst_code, output_path, compiler=TypstCompiler(root=tmp))
+        except CompileError as e:
+            if e.timed_out:
+                raise TimeoutError(str(e))
+            raise RenderError(str(e))
+        return output_path.read_bytes()
+
+
+def _warm():
+    return os.getpid()
+
+
+class LRUCache:
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> bytes | None:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: str, value: bytes):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class RenderService:
+    def __init__(self, workers: int | None = None, queue_size: int = 32, cache_size: int = 128, timeout: float = 120.0):
+        self.workers = workers or os.cpu_count() or 1
+        self.timeout = timeout
+        self.cache = LRUCache(cache_size)
+        self.latency = {kind: LatencyTracker() for kind, _ in ROUTES.values()}
+        self.rejected = 0
+        self.errors = 0
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.workers + queue_size)
+        self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        self._started = time.monotonic()
+
+        for future in [self._executor.submit(_warm) for _ in range(self.workers)]:
+            future.result()
+
+    def render(self, kind: str, texts: list[str], many: bool = False, title: str | None = None, subtitle: str | None = None) -> bytes:
+        start = time.perf_counter()
+        key = hashlib.sha256(json.dumps([kind, texts, many, title, subtitle]).encode()).hexdigest()
+
+        result = self.cache.get(key)
+        if result is None:
+            if not self._slots.acquire(blocking=False):
+                with self._lock:
+                    self.rejected += 1
+                raise Overloaded()
+
+            with self._lock:
+                self._in_flight += 1
+            try:
+                future = self._executor.submit(_render, kind, texts, many, title, subtitle)
+            except Exception:
+                self._release()
+                with self._lock:
+                    self.errors += 1
+                raise
+            future.add_done_callback(self._release)
+
+            try:
+                result = future.result(timeout=self.timeout)
+            except Exception:
+                future.cancel()
+                with self._lock:
+                    self.errors += 1
+                raise
+
+            self.cache.put(key, result)
+
+        self.latency[kind].record(time.perf_counter() - start)
+        return result
+
+    def _release(self, future=None):
+        with self._lock:
+            self._in_flight -= 1
+        self._slots.release()
+
+    def metrics(self) -> dict:
+        with self._lock:
+            in_flight = self._in_flight
+            rejected = self.rejected
+            errors = self.errors
+        return {
+            'uptime': time.monotonic() - self._started,
+            'workers': self.workers,
+            'in_flight': in_flight,
+            'rejected': rejected,
+            'errors': errors,
+            'cache': {'entries': len(self.cache), 'hits': self.cache.hits, 'misses': self.cache.misses},
+            'latency': {kind: tracker.summary() for kind, tracker in self.latency.items()},
+        }
+
+    def close(self):
+        self._executor.shutdown(cancel_futures=True)
+
+
+class RequestHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    service: RenderService
+    max_body_size = MAX_BODY_SIZE
+
+    def do_GET(self):
+        path = urlsplit(self.path).path
+        if path == '/metrics':
+            self._send(200, 'application/json', json.dumps(self.service.metrics()).encode())
+        elif path == '/health':
+            self._send(200, 'text/plain; charset=utf-8', b'ok\n')
+        else:
+            self._send_error(404, 'not found')
+
+    def do_POST(self):
+        url = urlsplit(self.path)
+        route = ROUTES.get(url.path)
+        if route is None:
+            self._send_error(404, 'not found')
+            return
+
+        kind, content_type = route
+        try:
+            length = int(self.headers.get('Content-Length', ''))
+        except ValueError:
+            length = -1
+        if length < 0:
+            self.close_connection = True
+            self._send_error(400, 'missing or invalid Content-Length')
+            return
+        if length > self.max_body_size:
+            self.close_connection = True
+            self._send_error(413, f'request body exceeds {self.max_body_size} bytes')
+            return
+
+        body = self.rfile.read(length).decode('utf-8', errors='replace')
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+
+        if self.headers.get_content_type() == 'application/json':
+            try:
+                request = json.loads(body)
+                texts = list(request['recipes'])
+            except (ValueError, KeyError, TypeError):
+                self._send_error(400, 'expected a JSON object with a "recipes" list')
+                return
+            many = True
+            title = request.get('title', query.get('title'))
+            subtitle = request.get('subtitle', query.get('subtitle'))
+        else:
+            texts = [body]
+            many = False
+            title = query.get('title')
+            subtitle = query.get('subtitle')
+
+        if not texts or not all(isinstance(text, str) for text in texts):
+            self._send_error(400, 'no recipes given')
+            return
+
+        try:
+            result = self.service.render(kind, texts, many=many, title=title, subtitle=subtitle)
+        except Overloaded:
+            self._send_error(503, 'server is overloaded', {'Retry-After': '1'})
+        except RenderError as e:
+            self._send_error(422, str(e))
+        except TimeoutError:
+            self._send_error(504, 'rendering timed out')
+        except Exception as e:
+            self._send_error(500, str(e) or type(e).__name__)
+        else:
+            self._send(200, content_type, result)
+
+    def _send(self, status: int, content_type: str, body: bytes, headers: dict | None = None):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_error(self, status: int, message: str, headers: dict | None = None):
+        self._send(status, 'application/json', json.dumps({'error': message}).encode(), headers)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def get_request(self):
+        request, _ = super().get_request()
+        return request, ('local', 0)
+
+
+def make_server(service: RenderService, host: str = '127.0.0.1', port: int = 8080, socket_path: str | None = None, max_body_size: int = MAX_BODY_SIZE):
+    handler = type('Handler', (RequestHandler,), {'service': service, 'max_body_size': max_body_size})
+
+    if socket_path:
+        try:
+            mode = os.stat(socket_path).st_mode
+        except FileNotFoundError:
+            pass
+        else:
+            if not stat.S_ISSOCK(mode):
+                raise FileExistsError(errno.EEXIST, 'refusing to replace a file that is not a socket', socket_path)
+            os.unlink(socket_path)
+        return UnixHTTPServer(socket_path, handler)
+
+    return ThreadingHTTPServer((host, port), handler)
@@ -0,0 +1,244 @@
+import re
+from dataclasses import dataclass
+from fractions import Fraction
+from typing import Iterable, Iterator
+
+from src.smidge import Recipe
+
+
+@dataclass
+class Ingredient:
+    quantity: Fraction | None
+    unit: str | None
+    name: str
+
+
+@dataclass
+class ShoppingItem:
+    name: str
+    quantity: Fraction | None = None
+    unit: str | None = None
+
+
+VOLUME_UNITS = {
+    'tsp': Fraction('4.92892159375'),
+    'tbsp': Fraction('14.78676478125'),
+    'fl oz': Fraction('29.5735295625'),
+    'cup': Fraction('236.5882365'),
+    'pint': Fraction('473.176473'),
+    'quart': Fraction('946.352946'),
+    'gallon': Fraction('3785.411784'),
+    'ml': Fraction(1),
+    'l': Fraction(1000),
+}
+
+MASS_UNITS = {
+    'oz': Fraction('28.349523125'),
+    'lb': Fraction('453.59237'),
+    'g': Fraction(1),
+    'kg': Fraction(1000),
+}
+
+COUNT_UNITS = ['can', 'clove', 'head', 'package', 'pinch', 'slice', 'stalk', 'stick']
+
+UNIT_ALIASES = {
+    'teaspoon': 'tsp', 'teaspoons': 'tsp', 'tsp': 'tsp', 'tsps': 'tsp', 't': 'tsp',
+    'tablespoon': 'tbsp', 'tablespoons': 'tbsp', 'tbsp': 'tbsp', 'tbsps': 'tbsp', 'tbs': 'tbsp', 'T': 'tbsp',
+    'fluid ounce': 'fl oz', 'fluid ounces': 'fl oz', 'fl oz': 'fl oz', 'fl. oz': 'fl oz',
+    'cup': 'cup', 'cups': 'cup', 'c': 'cup',
+    'pint': 'pint', 'pints': 'pint', 'pt': 'pint',
+    'quart': 'quart', 'quarts': 'quart', 'qt': 'quart',
+    'gallon': 'gallon', 'gallons': 'gallon', 'gal': 'gallon',
+    'milliliter': 'ml', 'milliliters': 'ml', 'millilitre': 'ml', 'millilitres': 'ml', 'ml': 'ml',
+    'liter': 'l', 'liters': 'l', 'litre': 'l', 'litres': 'l', 'l': 'l',
+    'ounce': 'oz', 'ounces': 'oz', 'oz': 'oz',
+    'pound': 'lb', 'pounds': 'lb', 'lb': 'lb', 'lbs': 'lb',
+    'gram': 'g', 'grams': 'g', 'g': 'g',
+    'kilogram': 'kg', 'kilograms': 'kg', 'kg': 'kg',
+    **{unit: unit for unit in COUNT_UNITS},
+    **{unit + 's': unit for unit in COUNT_UNITS},
+    'pinches': 'pinch',
+}
+
+UNIT_PLURALS = {
+    'cup': 'cups', 'pint': 'pints', 'quart': 'quarts', 'gallon': 'gallons',
+    'can': 'cans', 'clove': 'cloves', 'head': 'heads', 'package': 'packages',
+    'pinch': 'pinches', 'slice': 'slices', 'stalk': 'stalks', 'stick': 'sticks',
+}
+
+UNICODE_FRACTIONS = {
+    '½': Fraction(1, 2), '⅓': Fraction(1, 3), '⅔': Fraction(2, 3), '¼': Fraction(1, 4),
+    '¾': Fraction(3, 4), '⅛': Fraction(1, 8), '⅜': Fraction(3, 8), '⅝': Fraction(5, 8), '⅞': Fraction(7, 8),
+}
+
+_QUANTITY = re.compile(
+    r'^(?:(?P<whole>\d+)\s+(?P<mixed>\d+/\d+)'
+    r'|(?P<fraction>\d+/\d+)'
+    r'|(?P<number>\d+(?:\.\d+)?)(?P<unicode>[' + ''.join(UNICODE_FRACTIONS) + r'])?'
+    r'|(?P<glyph>[' + ''.join(UNICODE_FRACTIONS) + r']))'
+    r'(?=\s|$|[a-zA-Z])\s*'
+)
+
+_UNIT = re.compile(
+    r'^(?P<unit>' + '|'.join(re.escape(alias) for alias in sorted(UNIT_ALIASES, key=len, reverse=True)) + r')\.?(?=\s|$)\s*',
+    re.IGNORECASE,
+)
+
+
+def _parse_quantity(match: re.Match) -> Fraction:
+    if match['whole']:
+        return int(match['whole']) + Fraction(match['mixed'])
+    if match['fraction']:
+        return Fraction(match['fraction'])
+    if match['number']:
+        quantity = Fraction(match['number'])
+        if match['unicode']:
+            quantity += UNICODE_FRACTIONS[match['unicode']]
+        return quantity
+    return UNICODE_FRACTIONS[match['glyph']]
+
+
+def split_quantity(text: str) -> tuple[Fraction | None, str]:
+    match = _QUANTITY.match(text)
+    if match is None:
+        return None, text
+    return _parse_quantity(match), text[match.end():]
+
+
+def parse_ingredient(text: str) -> Ingredient:
+    unit = None
+    quantity, rest = split_quantity(text.strip())
+
+    if quantity is not None:
+        match = _UNIT.match(rest)
+        if match:
+            alias = match['unit']
+            unit = UNIT_ALIASES.get(alias) or UNIT_ALIASES.get(alias.lower())
+            rest = rest[match.end():]
+
+    if rest.lower().startswith('of '):
+        rest = rest[3:]
+
+    return Ingredient(quantity=quantity, unit=unit, name=rest.strip())
+
+
+def _dimension(unit: str | None) -> tuple[str | None, Fraction]:
+    if unit in VOLUME_UNITS:
+        return 'volume', VOLUME_UNITS[unit]
+    if unit in MASS_UNITS:
+        return 'mass', MASS_UNITS[unit]
+    return unit, Fraction(1)
+
+
+def singular(word: str) -> str:
+    if word.endswith('ies') and len(word) > 4:
+        return word[:-3] + 'y'
+    if word.endswith('oes'):
+        return word[:-2]
+    if word.endswith('s') and not word.endswith(('ss', 'us', 'is')) and len(word) > 3:
+        return word[:-1]
+    return word
+
+
+def name_key(name: str) -> str:
+    key = name.split(',')[0].strip().lower()
+    key = re.sub(r'\s+', ' ', key)
+
+    head, _, last = key.rpartition(' ')
+    last = singular(last)
+
+    return f"{head} {last}" if head else last
+
+
+def iter_ingredients(recipes: Iterable[Recipe]) -> Iterator[str]:
+    for recipe in recipes:
+        for component in recipe.components:
+            yield from component.ingredients or []
+            for step in component.steps:
+                yield from step.ingredients or []
+
+
+def shopping_list(recipes: Iterable[Recipe]) -> list[ShoppingItem]:
+    groups = {}
+    parsed = {}
+
+    for text in iter_ingredients(recipes):
+        entry = parsed.get(text)
+        if entry is None:
+            ingredient = parse_ingredient(text)
+            dimension, factor = _dimension(ingredient.unit)
+            entry = parsed[text] = (ingredient, (name_key(ingredient.name), dimension), factor)
+
+        ingredient, key, factor = entry
+        if not ingredient.name:
+            continue
+
+        group = groups.get(key)
+        if group is None:
+            group = groups[key] = {'singular': None, 'plural': None, 'total': None, 'units': {}}
+
+        number = 'plural' if ingredient.quantity is not None and ingredient.quantity > 1 else 'singular'
+        if group[number] is None:
+            group[number] = ingredient.name
+
+        if ingredient.quantity is not None:
+            group['total'] = (group['total'] or 0) + ingredient.quantity * factor
+            group['units'][ingredient.unit] = factor
+
+    items = []
+    for _, group in sorted(groups.items(), key=lambda item: (item[0][0], item[0][1] or '')):
+        total = group['total']
+        if total is None:
+            items.append(ShoppingItem(name=group['singular'] or group['plural']))
+            continue
+
+        units = sorted(group['units'].items(), key=lambda unit: unit[1], reverse=True)
+        unit, factor = next(((u, f) for u, f in units if total / f >= 1), units[-1])
+        quantity = total / factor
+
+        if quantity > 1:
+            name = group['plural'] or group['singular']
+        else:
+            name = group['singular'] or group['plural']
+        items.append(ShoppingItem(name=name, quantity=quantity, unit=unit))
+
+    return items
+
+
+def format_quantity(quantity: Fraction) -> str:
+    if quantity.denominator > 16:
+        return f"{float(quantity):.2f}".rstrip('0').rstrip('.')
+
+    whole, remainder = divmod(quantity.numerator, quantity.denominator)
+    if not remainder:
+        return str(whole)
+    fraction = f"{remainder}/{quantity.denominator}"
+    return f"{whole} {fraction}" if whole else fraction
+
+
+def format_item(item: ShoppingItem) -> str:
+    if item.quantity is None:
+        return item.name
+
+    parts = [format_quantity(item.quantity)]
+    if item.unit:
+        parts.append(UNIT_PLURALS.get(item.unit, item.unit) if item.quantity > 1 else item.unit)
+    parts.append(item.name)
+    return ' '.join(parts)
+
+
+def shopping_list_to_text(items: list[ShoppingItem]) -> str:
+    return ''.join(f"- {format_item(item)}\n" for item in items)
+
+
+def shopping_list_to_typst(items: list[ShoppingItem]) -> str:
+    typst = "#align(center)[== Shopping List]\n"
+    typst += "#v(2em)\n\n"
+    typst += "#columns(2)[\n"
+    typst += "  #list(\n"
+    typst += "    spacing: 1em,\n"
+    for item in items:
+        typst += f"    [{format_item(item)}],\n"
+    typst += "  )\n"
+    typst += "]\n"
+    return typst
@@ -0,0 +1,213 @@
+import hashlib
+import json
+from dataclasses import dataclass, field
+from difflib import SequenceMatcher
+from typing import Iterable
+
+from src.smidge import Component, Recipe, Step
+
+
+MANIFEST_VERSION = 1
+
+
+@dataclass
+class ComponentChange:
+    index: int
+    name: str | None = None
+    status: str = 'modified'
+    ingredients_changed: bool = False
+    added_steps: list[int] = field(default_factory=list)
+    removed_steps: list[int] = field(default_factory=list)
+    modified_steps: list[int] = field(default_factory=list)
+
+
+@dataclass
+class RecipeDiff:
+    path: str
+    title: str
+    title_changed: bool = False
+    metadata_changed: bool = False
+    components: list[ComponentChange] = field(default_factory=list)
+
+
+@dataclass
+class SnapshotDiff:
+    added: list[str] = field(default_factory=list)
+    removed: list[str] = field(default_factory=list)
+    modified: list[RecipeDiff] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.modified)
+
+
+def _digest(*parts) -> str:
+    data = json.dumps(parts, ensure_ascii=False, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.blake2b(data.encode(), digest_size=16).hexdigest()
+
+
+def step_hash(step: Step) -> str:
+    return _digest('step', step.text, step.ingredients)
+
+
+def component_hash(component: Component) -> str:
+    return _component_entry(component)['hash']
+
+
+def recipe_hash(recipe: Recipe) -> str:
+    return recipe_entry(recipe)['hash']
+
+
+def _component_entry(component: Component) -> dict:
+    steps = [step_hash(step) for step in component.steps]
+    ingredients = _digest('ingredients', component.ingredients)
+    return {
+        'hash': _digest('component', component.name, ingredients, steps),
+        'name': component.name,
+        'ingredients': ingredients,
+        'steps': steps,
+    }
+
+
+def recipe_entry(recipe: Recipe) -> dict:
+    components = [_component_entry(component) for component in recipe.components]
+    metadata = _digest('metadata', recipe.metadata)
+    return {
+        'hash': _digest('recipe', recipe.title, metadata, [component['hash'] for component in components]),
+        'title': recipe.title,
+        'metadata': metadata,
+        'components': components,
+    }
+
+
+def _bucket(path: str) -> str:
+    return _digest('path', path)[:4]
+
+
+def build_manifest(recipes: Iterable[tuple[str, Recipe]]) -> dict:
+    tree = {}
+    for path, recipe in recipes:
+        bucket = _bucket(path)
+        node = tree.setdefault(bucket[:2], {'buckets': {}})
+        node['buckets'].setdefault(bucket, {'recipes': {}})['recipes'][path] = recipe_entry(recipe)
+
+    for node in tree.values():
+        for bucket in node['buckets'].values():
+            bucket['hash'] = _digest(sorted((path, entry['hash']) for path, entry in bucket['recipes'].items()))
+        node['hash'] = _digest(sorted((key, bucket['hash']) for key, bucket in node['buckets'].items()))
+
+    return {
+        'version': MANIFEST_VERSION,
+        'root': _digest(sorted((key, node['hash']) for key, node in tree.items())),
+        'tree': tree,
+    }
+
+
+def read_manifest(path: str) -> dict:
+    with open(path) as f:
+        manifest = json.load(f)
+    if not isinstance(manifest, dict) or manifest.get('version') != MANIFEST_VERSION:
+        raise ValueError(f"{path}: not a version {MANIFEST_VERSION} snapshot manifest")
+    return manifest
+
+
+def _changed(old: dict, new: dict):
+    for key in sorted(old.keys() | new.keys()):
+        old_child = old.get(key)
+        new_child = new.get(key)
+        if old_child is None or new_child is None or old_child['hash'] != new_child['hash']:
+            yield key, old_child, new_child
+
+
+def _diff_steps(change: ComponentChange, old: list[str], new: list[str]):
+    for tag, i1, i2, j1, j2 in SequenceMatcher(None, old, new, autojunk=False).get_opcodes():
+        if tag == 'equal':
+            continue
+        common = min(i2 - i1, j2 - j1) if tag == 'replace' else 0
+        change.modified_steps.extend(range(j1, j1 + common))
+        change.removed_steps.extend(range(i1 + common, i2))
+        change.added_steps.extend(range(j1 + common, j2))
+
+
+def diff_recipe(path: str, old: dict, new: dict) -> RecipeDiff:
+    diff = RecipeDiff(path=path, title=new['title'], title_changed=old['title'] != new['title'], metadata_changed=old['metadata'] != new['metadata'])
+
+    old_components = old['components']
+    new_components = new['components']
+    matcher = SequenceMatcher(None, [c['hash'] for c in old_components], [c['hash'] for c in new_components], autojunk=False)
+
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == 'equal':
+            continue
+        common = min(i2 - i1, j2 - j1) if tag == 'replace' else 0
+
+        for offset in range(common):
+            old_component, new_component = old_components[i1 + offset], new_components[j1 + offset]
+            change = ComponentChange(index=j1 + offset, name=new_component['name'], ingredients_changed=old_component['ingredients'] != new_component['ingredients'])
+            _diff_steps(change, old_component['steps'], new_component['steps'])
+            diff.components.append(change)
+
+        for i in range(i1 + common, i2):
+            diff.components.append(ComponentChange(index=i, name=old_components[i]['name'], status='removed'))
+        for j in range(j1 + common, j2):
+            diff.components.append(ComponentChange(index=j, name=new_components[j]['name'], status='added'))
+
+    return diff
+
+
+def diff_manifests(old: dict, new: dict) -> SnapshotDiff:
+    diff = SnapshotDiff()
+    if old['root'] == new['root']:
+        return diff
+
+    for _, old_node, new_node in _changed(old['tree'], new['tree']):
+        old_buckets = old_node['buckets'] if old_node else {}
+        new_buckets = new_node['buckets'] if new_node else {}
+
+        for _, old_bucket, new_bucket in _changed(old_buckets, new_buckets):
+            old_recipes = old_bucket['recipes'] if old_bucket else {}
+            new_recipes = new_bucket['recipes'] if new_bucket else {}
+
+            for path, old_entry, new_entry in _changed(old_recipes, new_recipes):
+                if old_entry is None:
+                    diff.added.append(path)
+                elif new_entry is None:
+                    diff.removed.append(path)
+                else:
+                    diff.modified.append(diff_recipe(path, old_entry, new_entry))
+
+    diff.added.sort()
+    diff.removed.sort()
+    diff.modified.sort(key=lambda recipe: recipe.path)
+    return diff
+
+
+def _positions(indices: list[int]) -> str:
+    return ', '.join(str(i + 1) for i in indices)
+
+
+def diff_to_text(diff: SnapshotDiff) -> str:
+    lines = [f"added: {path}" for path in diff.added]
+    lines += [f"removed: {path}" for path in diff.removed]
+
+    for recipe in diff.modified:
+        lines.append(f"modified: {recipe.path}")
+        if recipe.title_changed:
+            lines.append(f"  title changed to {recipe.title}")
+        if recipe.metadata_changed:
+            lines.append("  metadata changed")
+
+        for change in recipe.components:
+            label = f"  component {change.index + 1}" + (f" ({change.name})" if change.name else "")
+            if change.status != 'modified':
+                lines.append(f"{label}: {change.status}")
+                continue
+
+            details = []
+            if change.ingredients_changed:
+                details.append("ingredients changed")
+            for name, indices in [('modified', change.modified_steps), ('added', change.added_steps), ('removed', change.removed_steps)]:
+                if indices:
+                    details.append(f"step{'s' if len(indices) > 1 else ''} {_positions(indices)} {name}")
+            lines.append(f"{label}: {', '.join(details) or 'renamed'}")
+
+    return ''.join(line + '\n' for line in lines)
@@ -0,0 +1,168 @@
+import json
+import re
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Iterable, Iterator
+
+from src.smidge import Recipe
+from src.smidge.shopping import iter_ingredients, singular
+
+
+MATCHER_VERSION = 1
+ANNOTATION_CACHE_SIZE = 8192
+
+_TOKEN = re.compile(r'\w+')
+_TERMINAL = ''
+
+
+@dataclass
+class VocabularyEntry:
+    canonical: str
+    allergens: list[str] = field(default_factory=list)
+
+
+@dataclass
+class IngredientMatch:
+    text: str
+    canonical: str
+    allergens: list[str]
+    start: int
+    end: int
+
+
+@dataclass
+class IngredientAnnotation:
+    text: str
+    ingredients: list[str] = field(default_factory=list)
+    allergens: list[str] = field(default_factory=list)
+
+
+@lru_cache(maxsize=65536)
+def _normalize(word: str) -> str:
+    return singular(word.lower())
+
+
+def _tokens(text: str) -> list[tuple[str, int, int]]:
+    return [(_normalize(match.group()), match.start(), match.end()) for match in _TOKEN.finditer(text)]
+
+
+class IngredientMatcher:
+    def __init__(self, entries: list[VocabularyEntry], trie: dict):
+        self.entries = entries
+        self._trie = trie
+
+    @classmethod
+    def from_terms(cls, terms: Iterable) -> 'IngredientMatcher':
+        entries = []
+        indexes = {}
+        trie = {}
+
+        for term in terms:
+            if isinstance(term, str):
+                term = {'term': term}
+            tokens = [token for token, _, _ in _tokens(term['term'])]
+            if not tokens:
+                continue
+
+            canonical = term.get('canonical') or ' '.join(tokens)
+            allergens = sorted(set(term.get('allergens') or []))
+            key = (canonical, tuple(allergens))
+            if key not in indexes:
+                indexes[key] = len(entries)
+                entries.append(VocabularyEntry(canonical=canonical, allergens=allergens))
+
+            node = trie
+            for token in tokens:
+                node = node.setdefault(token, {})
+            node.setdefault(_TERMINAL, indexes[key])
+
+        return cls(entries, trie)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'IngredientMatcher':
+        if data.get('version') != MATCHER_VERSION:
+            raise ValueError(f"expected a version {MATCHER_VERSION} ingredient matcher")
+        entries = [VocabularyEntry(canonical=canonical, allergens=allergens) for canonical, allergens in data['entries']]
+        return cls(entries, data['trie'])
+
+    def to_dict(self) -> dict:
+        return {
+            'version': MATCHER_VERSION,
+            'entries': [[entry.canonical, entry.allergens] for entry in self.entries],
+            'trie': self._trie,
+        }
+
+    def save(self, path: str):
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, separators=(',', ':'))
+
+    def match(self, text: str) -> list[IngredientMatch]:
+        tokens = _tokens(text)
+        matches = []
+        i = 0
+
+        while i < len(tokens):
+            node = self._trie
+            best = None
+            j = i
+            while j < len(tokens):
+                node = node.get(tokens[j][0])
+                if node is None:
+                    break
+                j += 1
+                if _TERMINAL in node:
+                    best = (j, node[_TERMINAL])
+
+            if best is None:
+                i += 1
+                continue
+
+            end, index = best
+            entry = self.entries[index]
+            start_offset, end_offset = tokens[i][1], tokens[end - 1][2]
+            matches.append(IngredientMatch(text=text[start_offset:end_offset], canonical=entry.canonical, allergens=entry.allergens, start=start_offset, end=end_offset))
+            i = end
+
+        return matches
+
+    def annotate(self, text: str) -> IngredientAnnotation:
+        matches = self.match(text)
+        return IngredientAnnotation(
+            text=text,
+            ingredients=list(dict.fromkeys(match.canonical for match in matches)),
+            allergens=sorted({allergen for match in matches for allergen in match.allergens}),
+        )
+
+
+def load_matcher(path: str) -> IngredientMatcher:
+    with open(path) as f:
+        data = json.load(f)
+
+    if isinstance(data, list):
+        try:
+            return IngredientMatcher.from_terms(data)
+        except (KeyError, TypeError, AttributeError) as e:
+            raise ValueError(f"{path}: invalid vocabulary term: {e}")
+    if isinstance(data, dict) and 'trie' in data:
+        return IngredientMatcher.from_dict(data)
+    raise ValueError(f"{path}: expected a list of vocabulary terms or a saved matcher")
+
+
+def cached_annotator(matcher: IngredientMatcher, maxsize: int = ANNOTATION_CACHE_SIZE):
+    return lru_cache(maxsize=maxsize)(matcher.annotate)
+
+
+def annotate_recipes(recipes: Iterable[Recipe], matcher: IngredientMatcher) -> Iterator[list[IngredientAnnotation]]:
+    annotate = cached_annotator(matcher)
+
+    for recipe in recipes:
+        yield [annotate(text) for text in iter_ingredients([recipe])]
+
+
+def allergen_map(recipes: Iterable[Recipe], matcher: IngredientMatcher) -> dict[str, list[str]]:
+    allergens = {}
+    for annotations in annotate_recipes(recipes, matcher):
+        for annotation in annotations:
+            if annotation.allergens:
+                allergens[annotation.text] = annotation.allergens
+    return allergens
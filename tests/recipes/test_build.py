@@ -0,0 +1,153 @@
+import re
+import threading
+import time
+
+import pytest
+
+from src.smidge.build import BuildError, Job, Target, build, load_build_file, run_jobs
+
+
+def _write_tree(tmp_path):
+    recipes = tmp_path / "recipes"
+    recipes.mkdir()
+    (recipes / "brownies.recipe").write_text("---\nCategory: Dessert\nTags: [kids]\n---\n= Brownies\n\n- 1 cup sugar\n")
+    (recipes / "soup.recipe").write_text("---\nCategory: Soup\n---\n= Soup\n\n- 1 onion\n")
+    (recipes / "pie.recipe").write_text("---\nCategory: Dessert\n---\n= Pie\n\n- 1 apple\n")
+
+    build_file = tmp_path / "smidge.yaml"
+    build_file.write_text("""
+input: recipes/*.recipe
+output: dist
+targets:
+  full:
+    title: Full Edition
+  desserts:
+    title: Desserts
+    where:
+      Category: Dessert
+  kids:
+    title: Kids
+    where:
+      Tags: kids
+    depends: [full]
+""")
+    return build_file
+
+
+def test_load_build_file(tmp_path):
+    spec = load_build_file(str(_write_tree(tmp_path)))
+
+    assert len(spec.inputs) == 3
+    assert [target.name for target in spec.targets] == ['full', 'desserts', 'kids']
+    assert spec.targets[1].output == tmp_path / "dist" / "desserts.pdf"
+    assert spec.targets[2].depends == ['full']
+
+
+def test_build_parses_once_and_filters_targets(tmp_path):
+    spec = load_build_file(str(_write_tree(tmp_path)))
+    compiled = {}
+
+    def compile_pdf(typst_code, output_path):
+        compiled[output_path.name] = typst_code
+
+    results = build(spec, compile_pdf, jobs=2)
+
+    assert all(error is None for error in results.values())
+    assert set(compiled) == {'full.pdf', 'desserts.pdf', 'kids.pdf'}
+    assert "Soup" in compiled['full.pdf']
+    assert "Soup" not in compiled['desserts.pdf']
+    assert "Pie" in compiled['desserts.pdf']
+    assert "== Brownies" in compiled['kids.pdf']
+
+
+def test_build_selected_target_includes_dependencies(tmp_path):
+    spec = load_build_file(str(_write_tree(tmp_path)))
+    compiled = []
+
+    build(spec, lambda typst_code, output_path: compiled.append(output_path.name), selected=['kids'])
+
+    assert sorted(compiled) == ['full.pdf', 'kids.pdf']
+
+
+def test_run_jobs_respects_dependencies_and_concurrency():
+    lock = threading.Lock()
+    order = []
+    active = [0]
+    peak = [0]
+
+    def job(name):
+        def run():
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.01)
+            with lock:
+                active[0] -= 1
+                order.append(name)
+        return run
+
+    jobs = [Job('a', job('a')), Job('b', job('b'), ['a']), Job('c', job('c'), ['a']), Job('d', job('d'), ['b', 'c'])]
+    results = run_jobs(jobs, max_workers=2)
+
+    assert all(error is None for error in results.values())
+    assert order[0] == 'a'
+    assert order[-1] == 'd'
+    assert peak[0] <= 2
+
+
+def test_run_jobs_skips_dependents_of_failures():
+    def fail():
+        raise RuntimeError("boom")
+
+    results = run_jobs([Job('a', fail), Job('b', lambda: None, ['a']), Job('c', lambda: None)])
+
+    assert isinstance(results['a'], RuntimeError)
+    assert isinstance(results['b'], BuildError)
+    assert results['c'] is None
+
+
+def test_run_jobs_rejects_cycles():
+    with pytest.raises(BuildError):
+        run_jobs([Job('a', lambda: None, ['b']), Job('b', lambda: None, ['a'])])
+
+
+def test_build_accepts_query_strings(tmp_path):
+    build_file = _write_tree(tmp_path)
+    build_file.write_text(build_file.read_text().replace("    where:\n      Category: Dessert\n", "    where: Category=Dessert and tags != kids\n"))
+    spec = load_build_file(str(build_file))
+    compiled = {}
+
+    build(spec, lambda typst_code, output_path: compiled.setdefault(output_path.name, typst_code), selected=['desserts'])
+
+    assert "Pie" in compiled['desserts.pdf']
+    assert "Brownies" not in compiled['desserts.pdf']
+
+
+def test_build_cover_image_resolves_from_the_output_directory(tmp_path, monkeypatch):
+    build_file = _write_tree(tmp_path)
+    build_file.write_text(build_file.read_text().replace("    title: Full Edition\n", "    title: Full Edition\n    image: cover.jpg\n"))
+    (tmp_path / "cover.jpg").write_bytes(b"jpeg")
+    monkeypatch.chdir(tmp_path)
+    spec = load_build_file("smidge.yaml")
+    images = []
+
+    def compile_pdf(typst_code, output_path):
+        images.extend(output_path.parent / image for image in re.findall(r'image\("([^"]+)"', typst_code))
+
+    build(spec, compile_pdf, selected=['full'])
+
+    assert images and all(image.read_bytes() == b"jpeg" for image in images)
+
+
+def test_where_mapping_and_query_string_select_the_same_recipes(tmp_path):
+    build_file = _write_tree(tmp_path)
+    build_file.write_text(build_file.read_text().replace("      Category: Dessert\n", "      category: dessert\n      Tags: [kids, party]\n"))
+    spec = load_build_file(str(build_file))
+    spec.targets.append(Target(name='query', output=tmp_path / "dist" / "query.pdf", where="category = dessert and tags = kids"))
+    compiled = {}
+
+    build(spec, lambda typst_code, output_path: compiled.setdefault(output_path.name, typst_code), selected=['desserts', 'query'])
+
+    assert "Brownies" in compiled['desserts.pdf']
+    assert "Pie" not in compiled['desserts.pdf']
+    assert compiled['desserts.pdf'].replace("Desserts", "Cookbook") == compiled['query.pdf']
@@ -0,0 +1,126 @@
+import json
+from xml.etree import ElementTree
+
+from src.smidge import parse_recipe
+from src.smidge.check import check_file, check_files, reports_to_json, reports_to_junit, reports_to_text
+
+
+def test_valid_recipe_has_no_diagnostics():
+    recipe_text = """---
+Servings: 2
+---
+= Toast
+
+- 2 slices bread
+
+# Toast the bread
+"""
+    diagnostics = []
+    result = parse_recipe(recipe_text, diagnostics)
+
+    assert result.title == "Toast"
+    assert diagnostics == []
+
+
+def test_missing_title():
+    diagnostics = []
+    result = parse_recipe("- 1 egg\n\n# Cook egg\n", diagnostics)
+
+    assert result is None
+    assert [(d.line, d.severity, d.message) for d in diagnostics] == [
+        (1, 'warning', 'ingredient outside of any component'),
+        (3, 'warning', 'step outside of any component'),
+        (1, 'error', 'missing title'),
+    ]
+
+
+def test_line_numbers_account_for_frontmatter_and_leading_blank_lines():
+    recipe_text = """
+
+---
+Servings: 2
+---
+= Toast
+
+? what is this
+# Toast the bread
+"""
+    diagnostics = []
+    parse_recipe(recipe_text, diagnostics)
+
+    assert len(diagnostics) == 1
+    assert diagnostics[0].line == 8
+    assert diagnostics[0].severity == 'warning'
+    assert diagnostics[0].message.startswith('unrecognized line')
+
+
+def test_orphans_before_first_component():
+    recipe_text = """= Sandwich
+
+- 1 slice bread
+# Spread butter
+
++ Filling
+
+- 1 slice ham
+"""
+    diagnostics = []
+    parse_recipe(recipe_text, diagnostics)
+
+    assert [(d.line, d.message) for d in diagnostics] == [
+        (3, 'ingredient outside of any component'),
+        (4, 'step outside of any component'),
+    ]
+
+
+def test_frontmatter_that_is_not_a_mapping_is_dropped():
+    diagnostics = []
+    result = parse_recipe("---\n- a\n- b\n---\n= Toast\n", diagnostics)
+
+    assert result.metadata == {}
+    assert [(d.line, d.message) for d in diagnostics] == [(2, 'frontmatter is not a mapping')]
+
+
+def test_check_file_reports_invalid_frontmatter(tmp_path):
+    path = tmp_path / "bad.recipe"
+    path.write_text("---\nServings: [2\n---\n= Toast\n")
+
+    report = check_file(str(path))
+
+    assert len(report.failures()) == 1
+    assert report.failures()[0].message.startswith('invalid frontmatter')
+
+
+def test_check_files_in_parallel(tmp_path):
+    paths = []
+    for i in range(20):
+        path = tmp_path / f"{i}.recipe"
+        path.write_text(f"= Recipe {i}\n\n- 1 egg\n" if i % 5 else "- 1 egg\n")
+        paths.append(str(path))
+
+    reports = check_files(paths, jobs=2)
+
+    assert [report.path for report in reports] == paths
+    assert sum(1 for report in reports if report.failures()) == 4
+
+
+def test_report_formats(tmp_path):
+    good = tmp_path / "good.recipe"
+    good.write_text("= Toast\n\n- bread\n?\n")
+    bad = tmp_path / "bad.recipe"
+    bad.write_text("- bread\n")
+    reports = check_files([str(good), str(bad)], jobs=1)
+
+    assert f"{bad}:1: error: missing title" in reports_to_text(reports)
+
+    data = json.loads(reports_to_json(reports))
+    assert data['files'] == 2
+    assert data['errors'] == 1
+    assert data['warnings'] == 2
+
+    suite = ElementTree.fromstring(reports_to_junit(reports))
+    assert suite.get('tests') == '2'
+    assert suite.get('failures') == '1'
+
+    strict_suite = ElementTree.fromstring(reports_to_junit(reports, strict=True))
+    assert strict_suite.get('failures') == '2'
@@ -0,0 +1,131 @@
+import os
+import signal
+import stat
+import sys
+import time
+
+import pytest
+
+from src.smidge.compile import CompileError, CompileLimits, TypstCompiler, parse_typst_diagnostics
+
+
+FAKE_TYPST = f"""#!{sys.executable}
+import os, pathlib, signal, sys, time
+
+source, output = pathlib.Path(sys.argv[-2]), pathlib.Path(sys.argv[-1])
+code = source.read_text()
+calls = source.parent / 'calls'
+calls.write_text(calls.read_text() + 'x' if calls.exists() else 'x')
+
+if 'SLEEP' in code:
+    time.sleep(30)
+if 'CRASH' in code and len(calls.read_text()) < 2:
+    os.kill(os.getpid(), signal.SIGSEGV)
+if 'ABORT' in code:
+    os.abort()
+if 'ERROR' in code:
+    sys.stderr.write("error: unknown variable: oops\\n  ┌─ " + str(source) + ":3:2\\n  │\\n3 │ #oops\\n")
+    sys.exit(1)
+if 'MEMORY' in code:
+    bytearray(512 * 1024 * 1024)
+output.write_bytes(b'%PDF-fake ' + code.encode())
+"""
+
+
+@pytest.fixture
+def fake_typst(tmp_path):
+    path = tmp_path / 'typst'
+    path.write_text(FAKE_TYPST)
+    path.chmod(path.stat().st_mode | stat.S_IEXEC)
+    return str(path)
+
+
+def _leftovers(tmp_path):
+    return sorted(path.name for path in tmp_path.iterdir() if path.name.startswith('.'))
+
+
+def test_compile_writes_output_and_cleans_up(tmp_path, fake_typst):
+    compiler = TypstCompiler(executable=fake_typst)
+
+    compiler.compile("= Hello", tmp_path / 'out.pdf')
+
+    assert (tmp_path / 'out.pdf').read_bytes() == b'%PDF-fake = Hello'
+    assert _leftovers(tmp_path) == []
+    assert compiler.metrics()['count'] == 1
+
+
+def test_compile_error_is_structured_and_not_retried(tmp_path, fake_typst):
+    compiler = TypstCompiler(executable=fake_typst, retry_delay=0)
+
+    with pytest.raises(CompileError) as info:
+        compiler.compile("ERROR", tmp_path / 'out.pdf')
+
+    error = info.value
+    assert str(error) == "line 3: unknown variable: oops"
+    assert error.returncode == 1
+    assert "unknown variable" in error.stderr
+    assert [(d.line, d.severity) for d in error.diagnostics] == [(3, 'error')]
+    assert error.attempts == 1
+    assert (tmp_path / 'calls').read_text() == 'x'
+    assert not (tmp_path / 'out.pdf').exists()
+    assert _leftovers(tmp_path) == []
+
+
+def test_crash_is_retried(tmp_path, fake_typst):
+    compiler = TypstCompiler(executable=fake_typst, retry_delay=0)
+
+    compiler.compile("CRASH", tmp_path / 'out.pdf')
+
+    assert (tmp_path / 'calls').read_text() == 'xx'
+    assert (tmp_path / 'out.pdf').exists()
+
+
+def test_abort_is_not_retried(tmp_path, fake_typst):
+    compiler = TypstCompiler(executable=fake_typst, retry_delay=0)
+
+    with pytest.raises(CompileError) as info:
+        compiler.compile("ABORT", tmp_path / 'out.pdf')
+
+    assert info.value.returncode == -signal.SIGABRT
+    assert not info.value.transient
+    assert (tmp_path / 'calls').read_text() == 'x'
+
+
+def test_timeout_kills_compile(tmp_path, fake_typst):
+    compiler = TypstCompiler(executable=fake_typst, limits=CompileLimits(timeout=0.5))
+
+    start = time.monotonic()
+    with pytest.raises(CompileError) as info:
+        compiler.compile("SLEEP", tmp_path / 'out.pdf')
+
+    assert info.value.timed_out
+    assert not info.value.transient
+    assert time.monotonic() - start < 10
+    assert _leftovers(tmp_path) == []
+
+
+@pytest.mark.skipif(sys.platform != 'linux', reason='RLIMIT_AS is only enforced on Linux')
+def test_memory_limit(tmp_path, fake_typst):
+    compiler = TypstCompiler(executable=fake_typst, limits=CompileLimits(memory=256 * 1024 * 1024), retries=0)
+
+    with pytest.raises(CompileError) as info:
+        compiler.compile("MEMORY", tmp_path / 'out.pdf')
+
+    assert "MemoryError" in info.value.stderr
+
+
+def test_missing_executable(tmp_path):
+    with pytest.raises(CompileError) as info:
+        TypstCompiler(executable=os.fspath(tmp_path / 'missing'), retry_delay=0).compile("= Hi", tmp_path / 'out.pdf')
+
+    assert not info.value.transient
+    assert info.value.attempts == 1
+
+
+def test_parse_typst_diagnostics():
+    stderr = "warning: unused\n  ┌─ a.typ:1:1\n\nerror: expected expression\n  ┌─ /tmp/x.typ:12:4\n"
+
+    assert [(d.line, d.severity, d.message) for d in parse_typst_diagnostics(stderr)] == [
+        (1, 'warning', 'unused'),
+        (12, 'error', 'expected expression'),
+    ]
@@ -0,0 +1,56 @@
+from src.smidge import parse_recipe
+from src.smidge.dedupe import drop_duplicates, find_duplicates, recipe_features
+
+
+PANCAKES = """= Pancakes
+
+- 2 cups flour
+- 2 eggs
+- 1 cup milk
+- 1 tbsp sugar
+- 1 pinch salt
+
+# Whisk the flour, sugar and salt in a large bowl
+# Beat in the eggs and milk until smooth
+# Rest the batter for ten minutes
+# Cook ladlefuls in a hot buttered pan until golden
+"""
+
+SOUP = """= Tomato Soup
+
+- 1 kg tomatoes
+- 1 onion
+- 2 cloves garlic
+- 500 ml stock
+
+# Roast the tomatoes with the garlic
+# Soften the onion in olive oil
+# Simmer everything in the stock and blend
+"""
+
+
+def test_recipe_features_ignore_quantities():
+    assert recipe_features(parse_recipe(PANCAKES)) == recipe_features(parse_recipe(PANCAKES.replace("2 cups flour", "250 g Flour")))
+
+
+def test_find_duplicates_clusters_near_copies():
+    recipes = [
+        parse_recipe(PANCAKES),
+        parse_recipe(SOUP),
+        parse_recipe(PANCAKES.replace("= Pancakes", "= Pancakes (imported)").replace("1 cup milk", "250 ml milk")),
+        parse_recipe(PANCAKES.replace("until golden", "until golden on both sides")),
+        parse_recipe(SOUP.replace("Roast", "Grill").replace("Simmer", "Cook").replace("onion", "leek")),
+    ]
+
+    clusters = find_duplicates(recipes)
+
+    assert [(cluster.keep, [i for i, _ in cluster.duplicates]) for cluster in clusters] == [(0, [2, 3])]
+    scores = dict(clusters[0].duplicates)
+    assert scores[2] == 1.0
+    assert 0.8 <= scores[3] < 1.0
+
+
+def test_drop_duplicates_keeps_first():
+    recipes = [parse_recipe(SOUP), parse_recipe(PANCAKES), parse_recipe(SOUP)]
+
+    assert [recipe.title for recipe in drop_duplicates(recipes)] == ["Tomato Soup", "Pancakes"]
@@ -0,0 +1,110 @@
+import csv
+import io
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+from src.smidge.export import iter_recipes, write_csv, write_jsonl
+
+
+RECIPE = """---
+Servings: 2
+---
+= Boiled Egg
+
++ Egg
+
+- 1 egg
+
+# Boil water
+  - 4 cups water
+# Add egg
+"""
+
+
+def _write_corpus(tmp_path):
+    good = tmp_path / "egg.recipe"
+    good.write_text(RECIPE)
+    bad = tmp_path / "untitled.recipe"
+    bad.write_text("- 1 egg\n")
+    return [str(good), str(bad)]
+
+
+def test_iter_recipes_skips_unparseable_files(tmp_path):
+    paths = _write_corpus(tmp_path)
+
+    recipes = list(iter_recipes(paths))
+
+    assert [(path, recipe.title) for path, recipe in recipes] == [(paths[0], "Boiled Egg")]
+
+
+def test_iter_recipes_skips_files_over_parse_limits(tmp_path, capsys):
+    paths = _write_corpus(tmp_path)
+    long = tmp_path / "long.recipe"
+    long.write_text("= Long\n\n# " + "stir " * 4000 + "\n")
+    errors = []
+
+    recipes = list(iter_recipes([str(long), paths[0]], lambda path, error: errors.append(path)))
+
+    assert [recipe.title for _, recipe in recipes] == ["Boiled Egg"]
+    assert errors == [str(long)]
+    assert capsys.readouterr().err == ""
+    assert len(list(iter_recipes([str(long)]))) == 0
+
+
+def test_export_command_reports_files_over_parse_limits(tmp_path):
+    paths = _write_corpus(tmp_path)
+    long = tmp_path / "long.recipe"
+    long.write_text("= Long\n\n# " + "stir " * 4000 + "\n")
+
+    result = subprocess.run(
+        [sys.executable, '-m', 'src.smidge.main', 'export', paths[0], str(long)],
+        cwd=Path(__file__).parents[2], capture_output=True, text=True,
+    )
+
+    assert result.returncode == 0
+    assert [json.loads(line)['title'] for line in result.stdout.splitlines()] == ["Boiled Egg"]
+    assert "line 3: line exceeds" in result.stderr
+    assert "Traceback" not in result.stderr
+
+
+def test_write_jsonl(tmp_path):
+    paths = _write_corpus(tmp_path)
+    out = io.StringIO()
+
+    count = write_jsonl(iter_recipes(paths), out)
+
+    lines = out.getvalue().splitlines()
+    assert count == 1
+    assert len(lines) == 1
+
+    record = json.loads(lines[0])
+    assert record['path'] == paths[0]
+    assert record['title'] == "Boiled Egg"
+    assert record['metadata'] == {"Servings": 2}
+    assert record['components'] == [{
+        'name': "Egg",
+        'ingredients': ["1 egg"],
+        'steps': [
+            {'text': "Boil water", 'ingredients': ["4 cups water"]},
+            {'text': "Add egg", 'ingredients': None},
+        ],
+    }]
+
+
+def test_write_csv(tmp_path):
+    paths = _write_corpus(tmp_path)
+    out = io.StringIO()
+
+    count = write_csv(iter_recipes(paths), out)
+
+    rows = list(csv.reader(io.StringIO(out.getvalue())))
+    assert count == 1
+    assert rows == [
+        ['path', 'title', 'component', 'kind', 'step', 'position', 'text'],
+        [paths[0], "Boiled Egg", "Egg", 'ingredient', '', '1', "1 egg"],
+        [paths[0], "Boiled Egg", "Egg", 'step', '1', '1', "Boil water"],
+        [paths[0], "Boiled Egg", "Egg", 'ingredient', '1', '1', "4 cups water"],
+        [paths[0], "Boiled Egg", "Egg", 'step', '2', '2', "Add egg"],
+    ]
@@ -0,0 +1,73 @@
+import pytest
+
+from src.smidge import Recipe, parse_recipe
+from src.smidge.facets import FacetIndex, QueryError, parse_duration, parse_query, recipe_facets
+
+
+def _recipe(title, **metadata):
+    return Recipe(title=title, components=[], metadata={key.replace('_', ' ').title(): value for key, value in metadata.items()})
+
+
+def test_parse_duration():
+    assert parse_duration("20 minutes") == 20
+    assert parse_duration("1 hour 30 minutes") == 90
+    assert parse_duration("1h30m") == 90
+    assert parse_duration("1 1/2 hours") == 90
+    assert parse_duration("PT1H15M") == 75
+    assert parse_duration("about 45 min") == 45
+    assert parse_duration("20-30 minutes") == 20
+    assert parse_duration(25) == 25
+    assert parse_duration("overnight") is None
+
+
+def test_recipe_facets_normalises_metadata():
+    recipe = parse_recipe("""---
+Category: Dessert
+prep_time: 15 minutes
+Cook Time: 1 hour
+Serves: 6-8 people
+Tags: kids, quick
+---
+= Brownies
+""")
+
+    facets = recipe_facets(recipe)
+
+    assert (facets.prep_time, facets.cook_time, facets.total_time) == (15, 60, 75)
+    assert facets.servings == 6
+    assert facets.categories == ['Dessert']
+    assert facets.tags == ['kids', 'quick']
+
+
+def test_facet_index_query():
+    recipes = [
+        _recipe("Brownies", category="Dessert", prep_time="15 min", cook_time="25 min", tags=["kids"]),
+        _recipe("Pie", category="Dessert", total_time="2 hours", servings=8),
+        _recipe("Sorbet", category="dessert", prep_time="10 min"),
+        _recipe("Soup", category="Soup", prep_time="10 min", cook_time="20 min", servings="4"),
+        _recipe("Toast", source="Grandma"),
+    ]
+    index = FacetIndex(recipes)
+
+    def titles(query):
+        return [recipe.title for recipe in index.filter(query)]
+
+    assert titles("Category=Dessert and total time < 45 min") == ["Brownies", "Sorbet"]
+    assert titles("total time <= 30") == ["Sorbet", "Soup"]
+    assert titles("servings >= 4 AND category != soup") == ["Pie"]
+    assert titles("tags = kids") == ["Brownies"]
+    assert titles("Source = 'Grandma'") == ["Toast"]
+    assert titles("") == [recipe.title for recipe in recipes]
+
+
+def test_parse_query_errors():
+    assert [condition.value for condition in parse_query('category = "Mac and Cheese" and time > 1h')] == ['mac and cheese', 60]
+
+    with pytest.raises(QueryError):
+        parse_query("total time < soon")
+    with pytest.raises(QueryError):
+        parse_query("category < Dessert")
+    with pytest.raises(QueryError):
+        parse_query("Dessert")
+    with pytest.raises(QueryError):
+        parse_query("Category = Dessert and")
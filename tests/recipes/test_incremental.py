@@ -0,0 +1,106 @@
+import random
+
+import yaml
+
+from src.smidge import parse_recipe
+from src.smidge.incremental import IncrementalParser
+
+
+RECIPE = """---
+Servings: 4
+---
+= Chicken Parmesan
+
++ Chicken
+
+- 4 chicken breasts
+- 1 cup breadcrumbs
+
+# Pound chicken thin
+# Pan fry until golden
+
++ Sauce
+
+# Sauté until fragrant
+  - 3 cloves garlic
+# Add and simmer
+  - 1 can crushed tomatoes
+"""
+
+
+def _replace(parser, old, new):
+    offset = parser.text.index(old)
+    return parser.edit(offset, len(old), new)
+
+
+def test_initial_parse_matches_parse_recipe():
+    parser = IncrementalParser(RECIPE)
+
+    assert parser.recipe == parse_recipe(RECIPE)
+
+
+def test_edit_reuses_unchanged_components_and_steps():
+    parser = IncrementalParser(RECIPE)
+    chicken, sauce = parser.recipe.components
+    first_step = sauce.steps[0]
+
+    change = _replace(parser, "1 can crushed tomatoes", "2 cans crushed tomatoes")
+
+    assert parser.recipe == parse_recipe(parser.text)
+    assert parser.recipe.components[0] is chicken
+    assert parser.recipe.components[1] is not sauce
+    assert parser.recipe.components[1].steps[0] is first_step
+    assert change.changed_components == [1]
+    assert change.changed_steps == {1: [1]}
+    assert change.removed_components == []
+    assert not change.title_changed
+    assert not change.metadata_changed
+
+
+def test_adding_and_removing_components():
+    parser = IncrementalParser(RECIPE)
+
+    change = _replace(parser, "+ Sauce\n", "+ Topping\n\n- 1 cup mozzarella\n\n+ Sauce\n")
+    assert parser.recipe == parse_recipe(parser.text)
+    assert [c.name for c in parser.recipe.components] == ["Chicken", "Topping", "Sauce"]
+    assert change.changed_components == [1]
+
+    change = _replace(parser, "+ Topping\n\n- 1 cup mozzarella\n\n", "")
+    assert parser.recipe == parse_recipe(parser.text)
+    assert [c.name for c in parser.recipe.components] == ["Chicken", "Sauce"]
+    assert change.changed_components == []
+    assert change.removed_components == [1]
+
+
+def test_title_and_metadata_changes():
+    parser = IncrementalParser(RECIPE)
+
+    change = _replace(parser, "Servings: 4", "Servings: 6")
+    assert parser.recipe.metadata == {"Servings": 6}
+    assert change.metadata_changed
+    assert change.changed_components == []
+
+    change = _replace(parser, "= Chicken Parmesan", "= Chicken Parm")
+    assert parser.recipe.title == "Chicken Parm"
+    assert change.title_changed
+
+    _replace(parser, "= Chicken Parm", "Chicken Parm")
+    assert parser.recipe is None
+
+
+def test_random_edits_match_full_parse():
+    rng = random.Random(0)
+    snippets = ["\n", "+ Part\n", "= Title\n", "- 1 egg\n", "  - salt\n", "# Stir\n", "---\n", "a: 1\n", " ", "x", "# ", "+ "]
+    parser = IncrementalParser(RECIPE)
+
+    for _ in range(500):
+        offset = rng.randint(0, len(parser.text))
+        removed = rng.randint(0, min(len(parser.text) - offset, rng.choice([0, 1, 10])))
+        inserted = "".join(rng.choice(snippets) for _ in range(rng.randint(0, 2)))
+
+        try:
+            parser.edit(offset, removed, inserted)
+        except yaml.YAMLError:
+            continue
+
+        assert parser.recipe == parse_recipe(parser.text)
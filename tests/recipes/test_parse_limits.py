@@ -0,0 +1,75 @@
+import pytest
+
+from src.smidge import parse_recipe, ParseLimits, RecipeLimitError
+
+
+def test_long_line_is_rejected():
+    recipe_text = "= Toast\n\n- " + "x" * 100 + "\n"
+    diagnostics = []
+
+    with pytest.raises(RecipeLimitError):
+        parse_recipe(recipe_text, diagnostics, limits=ParseLimits(max_line_length=50))
+
+    assert [(d.line, d.severity) for d in diagnostics] == [(3, 'error')]
+    assert parse_recipe(recipe_text).components[0].ingredients == ["x" * 100]
+
+
+def test_frontmatter_scan_is_bounded():
+    recipe_text = "---\n" + "Servings: 2\n" * 100 + "= Toast\n"
+
+    with pytest.raises(RecipeLimitError):
+        parse_recipe(recipe_text, limits=ParseLimits(max_frontmatter_size=200))
+
+
+def test_short_unterminated_frontmatter_is_ignored():
+    diagnostics = []
+    result = parse_recipe("---\n= Toast\n\n- bread\n", diagnostics)
+
+    assert result.title == "Toast"
+    assert result.metadata == {}
+    assert diagnostics[0].message == 'unterminated frontmatter'
+
+
+def test_yaml_alias_bomb_is_rejected():
+    recipe_text = """---
+a: &a [x, x, x, x, x, x, x, x, x, x]
+b: &b [*a, *a, *a, *a, *a, *a, *a, *a, *a, *a]
+c: &c [*b, *b, *b, *b, *b, *b, *b, *b, *b, *b]
+d: &d [*c, *c, *c, *c, *c, *c, *c, *c, *c, *c]
+e: [*d, *d, *d, *d, *d, *d, *d, *d, *d, *d]
+---
+= Toast
+"""
+    with pytest.raises(RecipeLimitError):
+        parse_recipe(recipe_text)
+
+
+def test_recursive_yaml_alias_is_rejected():
+    with pytest.raises(RecipeLimitError):
+        parse_recipe("---\na: &a [*a]\n---\n= Toast\n")
+
+
+def test_deeply_nested_yaml_is_rejected():
+    recipe_text = "---\na: " + "[" * 1000 + "]" * 1000 + "\n---\n= Toast\n"
+
+    with pytest.raises(RecipeLimitError):
+        parse_recipe(recipe_text)
+
+
+def test_deeply_nested_block_yaml_is_rejected():
+    recipe_text = "---\n" + "".join("  " * level + f"k{level}:\n" for level in range(100)) + "  " * 100 + "v: 1\n---\n= Toast\n"
+
+    with pytest.raises(RecipeLimitError):
+        parse_recipe(recipe_text)
+
+
+def test_brackets_in_quoted_strings_are_not_nesting():
+    result = parse_recipe("---\nNotes: '" + "[" * 70 + "'\n---\n= Toast\n")
+
+    assert result.metadata == {"Notes": "[" * 70}
+
+
+def test_benign_aliases_are_allowed():
+    result = parse_recipe("---\nPrep Time: &t 10 minutes\nCook Time: *t\n---\n= Toast\n")
+
+    assert result.metadata == {"Prep Time": "10 minutes", "Cook Time": "10 minutes"}
@@ -0,0 +1,52 @@
+from src.smidge import parse_recipe
+from src.smidge.rendering import COMPACT_PREAMBLE, recipe_to_typst
+
+
+RECIPE = """---
+Source: Grandma
+Category: Main
+Servings: 4
+---
+= Pancakes
+
++ Batter
+- 1 cup flour
+- 1 egg
+
+# Mix
+# Rest
+
++ Topping
+# Warm the syrup
+  - 2 tbsp maple syrup
+# Pour
+"""
+
+
+def test_compact_recipe_is_a_single_call():
+    recipe = parse_recipe(RECIPE)
+
+    typst = recipe_to_typst([recipe], compact=True)
+
+    assert typst.startswith(COMPACT_PREAMBLE)
+    body = typst[len(COMPACT_PREAMBLE):]
+    assert body == (
+        "#set page(footer: smidge-footer([Grandma]))\n"
+        "#smidge-recipe([Pancakes], metadata: (([Category], [Main]), ([Servings], [4]),), components: ("
+        "(name: [Batter], steps: ([Mix], [Rest],), ingredients: ([1 cup flour], [1 egg],)), "
+        "(name: [Topping], per-step: true, steps: (([Warm the syrup], ([2 tbsp maple syrup],)), ([Pour], none),)),"
+        "))\n"
+    )
+
+
+def test_compact_cookbook_defines_layout_once():
+    recipes = [parse_recipe(f"= Recipe {i}\n\n- 1 egg\n\n# Cook\n") for i in range(20)]
+
+    default = recipe_to_typst(recipes, title='Cookbook')
+    compact = recipe_to_typst(recipes, title='Cookbook', compact=True)
+
+    assert compact.count(COMPACT_PREAMBLE) == 1
+    assert compact.count("#smidge-recipe(") == 20
+    assert "#set list" not in compact[len(COMPACT_PREAMBLE):]
+    assert "#smidge-category([Uncategorized])" in compact
+    assert len(compact) < len(default)
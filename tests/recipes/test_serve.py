@@ -0,0 +1,192 @@
+import http.client
+import json
+import stat
+import sys
+import threading
+
+import pytest
+
+from src.smidge.serve import MAX_BODY_SIZE, LRUCache, Overloaded, RenderError, RenderService, _render, make_server
+
+
+RECIPE = "---\nServings: 2\n---\n= Toast\n\n- 2 slices bread\n\n# Toast the bread\n"
+
+
+@pytest.fixture(scope='module')
+def service():
+    service = RenderService(workers=1, queue_size=1, cache_size=4)
+    yield service
+    service.close()
+
+
+@pytest.fixture(scope='module')
+def server(service):
+    server = make_server(service, port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _request(server, method, path, body=None, headers=None):
+    connection = http.client.HTTPConnection('127.0.0.1', server.server_address[1], timeout=30)
+    connection.request(method, path, body=body, headers=headers or {})
+    response = connection.getresponse()
+    data = response.read()
+    connection.close()
+    return response.status, response.getheader('Content-Type'), data
+
+
+def test_parse_endpoint(server):
+    status, content_type, body = _request(server, 'POST', '/parse', RECIPE.encode())
+
+    assert status == 200
+    assert content_type == 'application/json'
+    record = json.loads(body)
+    assert record['title'] == "Toast"
+    assert record['metadata'] == {"Servings": 2}
+
+
+def test_typst_endpoint_with_json_body(server):
+    request = json.dumps({'recipes': [RECIPE, RECIPE.replace("Toast", "Bread")], 'title': "Breakfast"})
+    status, _, body = _request(server, 'POST', '/typst', request.encode(), {'Content-Type': 'application/json'})
+
+    assert status == 200
+    assert "Breakfast" in body.decode()
+    assert "== Bread" in body.decode()
+
+
+def test_invalid_recipe(server):
+    status, _, body = _request(server, 'POST', '/parse', b"- no title\n")
+
+    assert status == 422
+    assert json.loads(body)['error'] == 'recipe has no title'
+
+
+def test_metrics_endpoint(server):
+    _request(server, 'POST', '/parse', RECIPE.encode())
+    _request(server, 'POST', '/parse', RECIPE.encode())
+
+    status, _, body = _request(server, 'GET', '/metrics')
+
+    metrics = json.loads(body)
+    assert status == 200
+    assert metrics['cache']['hits'] >= 1
+    assert metrics['latency']['parse']['count'] >= 2
+    assert metrics['latency']['parse']['p99'] is not None
+
+
+def _raw_post(server, headers):
+    connection = http.client.HTTPConnection('127.0.0.1', server.server_address[1], timeout=30)
+    connection.putrequest('POST', '/parse')
+    for name, value in headers.items():
+        connection.putheader(name, value)
+    connection.endheaders()
+    response = connection.getresponse()
+    response.read()
+    connection.close()
+    return response.status
+
+
+def test_bad_content_length_is_rejected(server):
+    assert _raw_post(server, {}) == 400
+    assert _raw_post(server, {'Content-Length': 'lots'}) == 400
+    assert _raw_post(server, {'Content-Length': '-5'}) == 400
+
+
+def test_oversized_body_is_rejected_before_reading(server):
+    assert _raw_post(server, {'Content-Length': str(MAX_BODY_SIZE + 1)}) == 413
+
+
+def test_overload_is_rejected(service):
+    service._slots.acquire()
+    service._slots.acquire()
+    try:
+        with pytest.raises(Overloaded):
+            service.render('parse', ["= Uncached\n"])
+    finally:
+        service._slots.release()
+        service._slots.release()
+
+    assert service.rejected == 1
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(2)
+    cache.put('a', b'1')
+    cache.put('b', b'2')
+    cache.get('a')
+    cache.put('c', b'3')
+
+    assert cache.get('b') is None
+    assert cache.get('a') == b'1'
+    assert cache.get('c') == b'3'
+
+
+def test_timed_out_render_keeps_its_slot(tmp_path, monkeypatch):
+    typst = tmp_path / 'typst'
+    typst.write_text(f"#!{sys.executable}\nimport time\ntime.sleep(3)\n")
+    typst.chmod(typst.stat().st_mode | stat.S_IEXEC)
+    monkeypatch.setenv('SMIDGE_TYPST', str(typst))
+
+    service = RenderService(workers=1, queue_size=0, cache_size=0, timeout=0.5)
+    try:
+        with pytest.raises(TimeoutError):
+            service.render('pdf', [RECIPE])
+        assert service.metrics()['in_flight'] == 1
+
+        with pytest.raises(Overloaded):
+            service.render('pdf', [RECIPE.replace('Toast', 'Bread')])
+        assert service.rejected == 1
+    finally:
+        service.close()
+
+    assert service.metrics()['in_flight'] == 0
+
+
+def test_socket_path_must_not_replace_a_regular_file(service, tmp_path):
+    path = tmp_path / 'notes.txt'
+    path.write_text('keep me')
+
+    with pytest.raises(FileExistsError):
+        make_server(service, socket_path=str(path))
+
+    assert path.read_text() == 'keep me'
+
+
+def test_stale_socket_is_replaced(service, tmp_path):
+    path = str(tmp_path / 'smidge.sock')
+    make_server(service, socket_path=path).server_close()
+
+    server = make_server(service, socket_path=path)
+    server.server_close()
+
+
+FAKE_TYPST = f"""#!{sys.executable}
+import pathlib, re, sys
+
+root, source, output = pathlib.Path(sys.argv[3]), pathlib.Path(sys.argv[4]), pathlib.Path(sys.argv[5])
+code = source.read_text()
+for path in re.findall(r'read\\("([^"]+)"\\)', code):
+    target = root / path.lstrip('/') if path.startswith('/') else source.parent / path
+    if not target.exists():
+        sys.stderr.write(f"error: file not found (searched at {{target}})\\n")
+        sys.exit(1)
+    code += target.read_text()
+output.write_bytes(b'%PDF-fake ' + code.encode())
+"""
+
+
+def test_pdf_compiles_cannot_read_outside_the_request_directory(tmp_path, monkeypatch):
+    typst = tmp_path / 'typst'
+    typst.write_text(FAKE_TYPST)
+    typst.chmod(typst.stat().st_mode | stat.S_IEXEC)
+    monkeypatch.setenv('SMIDGE_TYPST', str(typst))
+    secret = tmp_path / 'secret.txt'
+    secret.write_text('hunter2')
+
+    with pytest.raises(RenderError, match='file not found'):
+        _render('pdf', [f'= #read("{secret}")\n\n- 1 egg\n'], False, None, None)
+
+    assert _render('pdf', [RECIPE], False, None, None).startswith(b'%PDF-fake')
@@ -0,0 +1,78 @@
+from fractions import Fraction
+
+from src.smidge import parse_recipe
+from src.smidge.rendering import recipe_to_typst
+from src.smidge.shopping import parse_ingredient, shopping_list, shopping_list_to_text
+
+
+def test_parse_ingredient():
+    assert parse_ingredient("1 1/2 cups flour") == (parse_ingredient("1½ cups flour"))
+
+    ingredient = parse_ingredient("1 1/2 cups flour")
+    assert ingredient.quantity == Fraction(3, 2)
+    assert ingredient.unit == 'cup'
+    assert ingredient.name == "flour"
+
+    ingredient = parse_ingredient("100g butter")
+    assert (ingredient.quantity, ingredient.unit, ingredient.name) == (100, 'g', "butter")
+
+    ingredient = parse_ingredient("3 cloves garlic")
+    assert (ingredient.quantity, ingredient.unit, ingredient.name) == (3, 'clove', "garlic")
+
+    ingredient = parse_ingredient("2 carrots")
+    assert (ingredient.quantity, ingredient.unit, ingredient.name) == (2, None, "carrots")
+
+    ingredient = parse_ingredient("salt to taste")
+    assert (ingredient.quantity, ingredient.unit, ingredient.name) == (None, None, "salt to taste")
+
+
+def test_shopping_list_merges_across_recipes():
+    pancakes = parse_recipe("""= Pancakes
+
+- 1 cup flour
+- 2 tbsp sugar
+- 1 egg
+- 1 cup milk
+""")
+    cookies = parse_recipe("""= Cookies
+
+# Cream together
+  - 1/2 cup sugar
+  - 2 eggs
+# Add dry ingredients
+  - 2 cups flour
+  - salt
+""")
+
+    items = shopping_list([pancakes, cookies])
+
+    assert shopping_list_to_text(items) == (
+        "- 3 eggs\n"
+        "- 3 cups flour\n"
+        "- 1 cup milk\n"
+        "- salt\n"
+        "- 10 tbsp sugar\n"
+    )
+
+
+def test_shopping_list_keeps_incompatible_units_apart():
+    recipe = parse_recipe("""= Bread
+
+- 500 g flour
+- 1 kg flour
+- 1 cup flour
+""")
+
+    items = shopping_list([recipe])
+
+    assert [(item.quantity, item.unit) for item in items] == [(Fraction(3, 2), 'kg'), (1, 'cup')]
+
+
+def test_recipe_to_typst_appends_shopping_list_page():
+    recipe = parse_recipe("= Toast\n\n- 2 slices bread\n- 1 slice bread\n")
+
+    typst = recipe_to_typst([recipe], shopping_list=True)
+
+    assert typst.startswith(recipe_to_typst([recipe]))
+    assert "Shopping List" in typst
+    assert "[3 slices bread]" in typst
@@ -0,0 +1,65 @@
+import json
+
+from src.smidge import Step, parse_recipe
+from src.smidge.snapshot import build_manifest, diff_manifests, diff_to_text, recipe_hash, step_hash
+
+
+RECIPE = """---
+Category: Breakfast
+---
+= Pancakes
+
++ Batter
+- 1 cup flour
+- 1 egg
+
+# Mix
+# Rest
+# Cook
+
++ Topping
+# Warm the syrup
+"""
+
+
+def test_hashes_are_structural():
+    assert recipe_hash(parse_recipe(RECIPE)) == recipe_hash(parse_recipe("\n\n" + RECIPE.replace("# Mix", "#   Mix")))
+    assert recipe_hash(parse_recipe(RECIPE)) != recipe_hash(parse_recipe(RECIPE.replace("Breakfast", "Brunch")))
+    assert step_hash(Step(text="Mix")) != step_hash(Step(text="Mix", ingredients=["1 egg"]))
+
+
+def test_manifest_survives_json_round_trip():
+    manifest = build_manifest([("a.recipe", parse_recipe(RECIPE))])
+
+    assert not diff_manifests(manifest, json.loads(json.dumps(manifest)))
+
+
+def test_diff_reports_recipes_components_and_steps():
+    old = build_manifest([
+        ("pancakes.recipe", parse_recipe(RECIPE)),
+        ("toast.recipe", parse_recipe("= Toast\n# Toast it\n")),
+    ])
+    new = build_manifest([
+        ("pancakes.recipe", parse_recipe(RECIPE.replace("- 1 egg", "- 2 eggs").replace("# Rest", "# Rest for 5 minutes").replace("# Cook", "# Cook\n# Serve"))),
+        ("porridge.recipe", parse_recipe("= Porridge\n# Stir\n")),
+    ])
+
+    diff = diff_manifests(old, new)
+
+    assert diff.added == ["porridge.recipe"]
+    assert diff.removed == ["toast.recipe"]
+    assert [recipe.path for recipe in diff.modified] == ["pancakes.recipe"]
+
+    pancakes = diff.modified[0]
+    assert not pancakes.title_changed and not pancakes.metadata_changed
+    assert len(pancakes.components) == 1
+    change = pancakes.components[0]
+    assert (change.index, change.name, change.ingredients_changed) == (0, "Batter", True)
+    assert (change.modified_steps, change.added_steps, change.removed_steps) == ([1], [3], [])
+
+    assert diff_to_text(diff) == (
+        "added: porridge.recipe\n"
+        "removed: toast.recipe\n"
+        "modified: pancakes.recipe\n"
+        "  component 1 (Batter): ingredients changed, step 2 modified, step 4 added\n"
+    )
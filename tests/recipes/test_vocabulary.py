@@ -0,0 +1,84 @@
+import io
+import json
+
+from src.smidge import parse_recipe
+from src.smidge.export import write_jsonl
+from src.smidge.rendering import recipe_to_typst
+from src.smidge.vocabulary import IngredientMatcher, allergen_map, annotate_recipes, cached_annotator, load_matcher
+
+
+TERMS = [
+    {"term": "all-purpose flour", "canonical": "wheat flour", "allergens": ["gluten"]},
+    {"term": "flour", "allergens": ["gluten"]},
+    {"term": "eggs", "allergens": ["egg"]},
+    {"term": "peanut butter", "allergens": ["peanut"]},
+    "butter",
+    "olive oil",
+]
+
+RECIPE = parse_recipe("""= Cookies
+
+- 2 cups All-Purpose Flour, sifted
+- 1 egg
+- 1 tbsp olive oil
+
+# Cream together
+  - 100 g peanut butter and butter
+""")
+
+
+def test_match_prefers_longest_terms_at_word_boundaries():
+    matcher = IngredientMatcher.from_terms(TERMS)
+
+    assert [(m.text, m.canonical) for m in matcher.match("2 cups All-Purpose Flour, sifted")] == [("All-Purpose Flour", "wheat flour")]
+    assert [(m.canonical, m.allergens) for m in matcher.match("3 large eggs")] == [("egg", ["egg"])]
+    assert [m.canonical for m in matcher.match("100 g peanut butter and butter")] == ["peanut butter", "butter"]
+    assert matcher.match("1 buttermilk pancake") == []
+
+
+def test_matcher_round_trips_through_json(tmp_path):
+    vocabulary = tmp_path / "vocabulary.json"
+    vocabulary.write_text(json.dumps(TERMS))
+    saved = tmp_path / "matcher.json"
+
+    load_matcher(str(vocabulary)).save(str(saved))
+    matcher = load_matcher(str(saved))
+
+    assert matcher.annotate("2 cups flour").allergens == ["gluten"]
+
+
+def test_annotate_recipes_in_bulk():
+    matcher = IngredientMatcher.from_terms(TERMS)
+
+    [annotations] = annotate_recipes([RECIPE], matcher)
+
+    assert [annotation.ingredients for annotation in annotations] == [["wheat flour"], ["egg"], ["olive oil"], ["peanut butter", "butter"]]
+    assert allergen_map([RECIPE], matcher) == {
+        "2 cups All-Purpose Flour, sifted": ["gluten"],
+        "1 egg": ["egg"],
+        "100 g peanut butter and butter": ["peanut"],
+    }
+
+
+def test_cached_annotator_is_bounded():
+    annotate = cached_annotator(IngredientMatcher.from_terms(TERMS), maxsize=2)
+
+    for text in ["1 egg", "2 cups flour", "1 tbsp butter", "1 egg"]:
+        annotate(text)
+
+    assert annotate.cache_info().currsize == 2
+    assert annotate("2 cups flour").allergens == ["gluten"]
+
+
+def test_allergens_in_export_and_typst():
+    matcher = IngredientMatcher.from_terms(TERMS)
+
+    out = io.StringIO()
+    write_jsonl([("cookies.recipe", RECIPE)], out, matcher=matcher)
+    record = json.loads(out.getvalue())
+    assert record["allergens"] == ["egg", "gluten", "peanut"]
+    assert record["annotations"][1] == {"text": "1 egg", "ingredients": ["egg"], "allergens": ["egg"]}
+
+    typst = recipe_to_typst([RECIPE], allergens=allergen_map([RECIPE], matcher))
+    assert '[100 g peanut butter and butter #h(1fr) #text(size: 0.80em, fill: rgb("#666666"))[peanut]]' in typst
+    assert recipe_to_typst([RECIPE], allergens={}) == recipe_to_typst([RECIPE])